@@ -36,7 +36,7 @@ makes Jedi use ~500mb of memory. Since we might want a bit more than those few
 libraries, we just increase it a bit.
 """
 
-_PICKLE_VERSION = 33
+_PICKLE_VERSION = 34
 """
 Version number (integer) for file system cache.
 
@@ -133,24 +133,53 @@ def load_module(hashed_grammar, file_io, cache_path=None):
 
 
 def _load_from_file_system(hashed_grammar, path, p_time, cache_path=None):
-    cache_path = _get_hashed_path(hashed_grammar, path, cache_path=cache_path)
+    pickle_path = _get_hashed_path(hashed_grammar, path, cache_path=cache_path)
     try:
-        if p_time > os.path.getmtime(cache_path):
+        if p_time > os.path.getmtime(pickle_path):
             # Cache is outdated
             return None
+    except FileNotFoundError:
+        return None
+
+    module_cache_item = _load_pickle(pickle_path)
+    if module_cache_item is None:
+        return None
+    _set_cache_item(hashed_grammar, path, module_cache_item)
+    LOG.debug('pickle loaded: %s', path)
+    return module_cache_item.node
+
 
-        with open(cache_path, 'rb') as f:
+def _load_pickle(pickle_path):
+    try:
+        with open(pickle_path, 'rb') as f:
             gc.disable()
             try:
-                module_cache_item = pickle.load(f)
+                return pickle.load(f)
             finally:
                 gc.enable()
     except FileNotFoundError:
         return None
-    else:
-        _set_cache_item(hashed_grammar, path, module_cache_item)
-        LOG.debug('pickle loaded: %s', path)
-        return module_cache_item.node
+
+
+def load_cache_item(hashed_grammar, path, from_file_system=True, cache_path=None):
+    """
+    Returns the cached module and lines of a path (a ``_NodeCacheItem``) from
+    RAM or from the file system, even if the file has changed since. This is
+    what the diff parser needs after a restart. Returns None if there is no
+    cached module.
+    """
+    try:
+        return parser_cache[hashed_grammar][path]
+    except KeyError:
+        pass
+    if path is None or not from_file_system:
+        return None
+    module_cache_item = _load_pickle(
+        _get_hashed_path(hashed_grammar, path, cache_path=cache_path)
+    )
+    if module_cache_item is not None:
+        LOG.debug('pickle loaded for the diff parser: %s', path)
+    return module_cache_item
 
 
 def _set_cache_item(hashed_grammar, path, module_cache_item):
@@ -194,6 +223,18 @@ def try_to_save_module(hashed_grammar, file_io, module, lines, pickling=True, ca
             _remove_cache_and_update_lock(cache_path=cache_path)
 
 
+def save_document_module(hashed_grammar, document_key, module, lines):
+    """
+    Keeps the module of a document (e.g. an unsaved buffer) in RAM. Documents
+    are never pickled.
+    """
+    _set_cache_item(hashed_grammar, document_key, _NodeCacheItem(module, lines))
+
+
+def remove_document_module(hashed_grammar, document_key):
+    parser_cache.get(hashed_grammar, {}).pop(document_key, None)
+
+
 def _save_to_file_system(hashed_grammar, path, item, cache_path=None):
     with open(_get_hashed_path(hashed_grammar, path, cache_path=cache_path), 'wb') as f:
         pickle.dump(item, f, pickle.HIGHEST_PROTOCOL)
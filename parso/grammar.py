@@ -1,6 +1,9 @@
 import hashlib
 import os
-from typing import Generic, TypeVar, Union, Dict, Optional, Any, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Generic, TypeVar, Union, Dict, Optional, Any, Iterator, Sequence, Tuple, \
+    Hashable, Iterable, List
 from pathlib import Path
 
 from parso._compatibility import is_pypy
@@ -10,15 +13,18 @@ from parso.utils import split_lines, python_bytes_to_unicode, \
 from parso.python.diff import DiffParser
 from parso.python.tokenize import tokenize_lines, tokenize, PythonToken
 from parso.python.token import PythonTokenTypes
-from parso.cache import parser_cache, load_module, try_to_save_module
-from parso.parser import BaseParser
+from parso.cache import load_cache_item, load_module, try_to_save_module, \
+    save_document_module, remove_document_module
+from parso.parser import BaseParser, ParserSyntaxError
 from parso.python.parser import Parser as PythonParser
 from parso.python.errors import ErrorFinderConfig
 from parso.python import pep8
 from parso.file_io import FileIO, KnownContentFileIO
-from parso.normalizer import RefactoringNormalizer, NormalizerConfig
+from parso.normalizer import RefactoringNormalizer, NormalizerConfig, Issue
 
 _loaded_grammars: Dict[str, 'Grammar'] = {}
+_pickled_grammars: Dict[Tuple[int, int, str], 'PythonGrammar'] = {}
+_MAX_CHECK_FILES_CHUNK_SIZE = 20
 
 _NodeT = TypeVar("_NodeT")
 
@@ -45,6 +51,8 @@ class Grammar(Generic[_NodeT]):
         self._tokenizer = tokenizer
         self._diff_parser = diff_parser
         self._hashed = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        # Error finders that are not used at the moment.
+        self._error_finders = []
 
     def parse(self,
               code: Union[str, bytes] = None,
@@ -55,7 +63,11 @@ class Grammar(Generic[_NodeT]):
               cache=False,
               diff_cache=False,
               cache_path: Union[os.PathLike, str] = None,
-              file_io: FileIO = None) -> _NodeT:
+              file_io: FileIO = None,
+              edits: Sequence[Tuple[Tuple[int, int], Tuple[int, int], str]] = None,
+              document_key: Hashable = None,
+              snapshot=False,
+              record_diff_changes=False) -> _NodeT:
         """
         If you want to parse a Python file you want to start here, most likely.
 
@@ -80,18 +92,53 @@ class Grammar(Generic[_NodeT]):
             code and tries to parse only the parts that have changed. Returns
             the same (changed) module that is found in cache. Using this option
             requires you to not do anything anymore with the cached modules
-            under that path, because the contents of it might change. This
+            under that path, because the contents of it might change (see
+            ``snapshot``). If
+            ``cache`` is enabled as well, a pickled module on the file system
+            is used if there's no module in RAM (e.g. after a restart). This
             option is still somewhat experimental. If you want stability,
             please don't use it.
         :param bool cache_path: If given saves the parso cache in this
             directory. If not given, defaults to the default cache places on
             each platform.
+        :param edits: A list of ``(start_pos, end_pos, new_text)`` tuples that
+            describe the changes to the code since the last parse of ``path``
+            (e.g. the content changes of a Language Server Protocol
+            ``didChange`` notification). Can only be used with ``diff_cache``
+            and instead of ``code``. The edits are applied one after another,
+            positions are parso positions (lines start at 1, columns at 0).
+            Only the changed lines are compared, which is faster than diffing
+            the whole file.
+        :param document_key: A hashable key (e.g. a buffer or a notebook cell
+            id) that is used instead of ``path`` for ``diff_cache``. This
+            allows diff parsing documents without a path or unsaved buffers.
+            These modules are only kept in RAM, never pickled, and should be
+            removed with :py:meth:`close_document` once the document is
+            closed.
+        :param bool snapshot: Only used with ``diff_cache``. The diff parser
+            changes a copy of the cached module instead of the module itself,
+            so modules that were returned before stay valid (e.g. while other
+            threads are still using them). Copying is a lot cheaper than
+            parsing, but the diff parser is faster without this option.
+        :param bool record_diff_changes: Only used with ``diff_cache``. Records
+            the nodes that the diff parser reused, added and removed, see
+            :py:meth:`parso.python.tree.Module.get_diff_changes`. The removed
+            nodes are kept alive until the next change of the module.
 
         :return: A subclass of :py:class:`parso.tree.NodeOrLeaf`. Typically a
             :py:class:`parso.python.tree.Module`.
         """
-        if code is None and path is None and file_io is None:
+        if code is None and path is None and file_io is None \
+                and (edits is None or document_key is None):
             raise TypeError("Please provide either code or a path.")
+        if edits is not None and (code is not None or not diff_cache):
+            raise TypeError("Edits can only be used with diff_cache and without code.")
+        if document_key is not None and not diff_cache:
+            raise TypeError("A document key can only be used with diff_cache.")
+        if snapshot and not diff_cache:
+            raise TypeError("Snapshots can only be used with diff_cache.")
+        if record_diff_changes and not diff_cache:
+            raise TypeError("Diff changes can only be recorded with diff_cache.")
 
         if isinstance(path, str):
             path = Path(path)
@@ -110,7 +157,11 @@ class Grammar(Generic[_NodeT]):
             else:
                 file_io = KnownContentFileIO(path, code)
 
-        if cache and file_io.path is not None:
+        if edits is not None:
+            return self._parse_edits(file_io, edits, document_key, snapshot,
+                                     record_diff_changes, cache, cache_path)
+
+        if cache and file_io.path is not None and document_key is None:
             module_node = load_module(self._hashed, file_io, cache_path=cache_path)
             if module_node is not None:
                 return module_node  # type: ignore[no-any-return]
@@ -124,26 +175,22 @@ class Grammar(Generic[_NodeT]):
             if self._diff_parser is None:
                 raise TypeError("You have to define a diff parser to be able "
                                 "to use this option.")
-            try:
-                module_cache_item = parser_cache[self._hashed][file_io.path]
-            except KeyError:
-                pass
-            else:
+            module_cache_item = self._load_cache_item(
+                file_io, document_key, cache, cache_path)
+            if module_cache_item is not None:
                 module_node = module_cache_item.node
                 old_lines = module_cache_item.lines
                 if old_lines == lines:
                     return module_node  # type: ignore[no-any-return]
 
                 new_node = self._diff_parser(
-                    self._pgen_grammar, self._tokenizer, module_node
+                    self._pgen_grammar, self._tokenizer, module_node, snapshot=snapshot,
+                    record_changes=record_diff_changes,
                 ).update(
                     old_lines=old_lines,
                     new_lines=lines
                 )
-                try_to_save_module(self._hashed, file_io, new_node, lines,
-                                   # Never pickle in pypy, it's slow as hell.
-                                   pickling=cache and not is_pypy,
-                                   cache_path=cache_path)
+                self._save_module(file_io, document_key, new_node, lines, cache, cache_path)
                 return new_node  # type: ignore[no-any-return]
 
         tokens = self._tokenizer(lines)
@@ -156,11 +203,81 @@ class Grammar(Generic[_NodeT]):
         root_node = p.parse(tokens=tokens)
 
         if cache or diff_cache:
-            try_to_save_module(self._hashed, file_io, root_node, lines,
+            self._save_module(file_io, document_key, root_node, lines, cache, cache_path)
+        return root_node  # type: ignore[no-any-return]
+
+    def close_document(self, document_key: Hashable) -> None:
+        """
+        Removes the module of a document that was parsed with a
+        ``document_key`` from the cache.
+        """
+        remove_document_module(self._hashed, document_key)
+
+    def _load_cache_item(self, file_io, document_key, cache, cache_path):
+        if document_key is not None:
+            return load_cache_item(self._hashed, document_key, from_file_system=False)
+        # After a restart there's only the pickled module on the file
+        # system, which is good enough for the diff parser.
+        return load_cache_item(
+            self._hashed, file_io.path,
+            from_file_system=cache,
+            cache_path=cache_path,
+        )
+
+    def _save_module(self, file_io, document_key, module, lines, cache, cache_path):
+        if document_key is not None:
+            save_document_module(self._hashed, document_key, module, lines)
+        else:
+            try_to_save_module(self._hashed, file_io, module, lines,
                                # Never pickle in pypy, it's slow as hell.
                                pickling=cache and not is_pypy,
                                cache_path=cache_path)
-        return root_node  # type: ignore[no-any-return]
+
+    def validate(self, code: Union[str, bytes], *,
+                 start_symbol: str = None) -> Optional[ParserSyntaxError]:
+        """
+        Checks if the code can be parsed without creating a syntax tree, which
+        is a lot faster than ``parse(code, error_recovery=False)``.
+
+        Returns None if the code is valid and otherwise the
+        :py:class:`parso.ParserSyntaxError` that parsing would raise. Only the
+        grammar is checked, use :py:meth:`iter_errors` for all errors.
+
+        :param str start_symbol: The grammar rule (nonterminal) that you want
+            to check, by default the whole file.
+        """
+        if start_symbol is None:
+            start_symbol = self._start_nonterminal
+
+        lines = split_lines(python_bytes_to_unicode(code), keepends=True)
+        parser = self._parser(
+            self._pgen_grammar,
+            error_recovery=False,
+            start_nonterminal=start_symbol
+        )
+        try:
+            parser.recognize(self._tokenizer(lines))
+        except ParserSyntaxError as e:
+            return e
+        return None
+
+    def _parse_edits(self, file_io, edits, document_key, snapshot, record_changes,
+                     cache, cache_path):
+        if self._diff_parser is None:
+            raise TypeError("You have to define a diff parser to be able "
+                            "to use this option.")
+        # Never use the pickled module, because the positions of the edits
+        # refer to code that might not be the code of the pickled module.
+        module_cache_item = self._load_cache_item(file_io, document_key, False, cache_path)
+        if module_cache_item is None:
+            raise ValueError("Edits can only be applied to a module in the diff cache.")
+
+        new_node, lines = self._diff_parser(
+            self._pgen_grammar, self._tokenizer, module_cache_item.node, snapshot=snapshot,
+            record_changes=record_changes,
+        ).apply_edits(module_cache_item.lines, edits)
+        self._save_module(file_io, document_key, new_node, lines, cache, cache_path)
+        return new_node
 
     def _get_token_namespace(self):
         ns = self._token_namespace
@@ -168,19 +285,108 @@ class Grammar(Generic[_NodeT]):
             raise ValueError("The token namespace should be set.")
         return ns
 
-    def iter_errors(self, node):
+    def iter_errors(self, node, *, incremental=False, line_range=None, max_issues=None):
         """
-        Given a :py:class:`parso.tree.NodeOrLeaf` returns a generator of
+        Given a :py:class:`parso.tree.NodeOrLeaf` returns a list of
         :py:class:`parso.normalizer.Issue` objects. For Python this is
         a list of syntax/indentation errors.
+
+        :param bool incremental: Caches the issues of the top-level statements
+            on the module. Later calls only check the statements that changed
+            since (e.g. after the diff parser changed a module), which is a
+            lot faster for big files. Only works for modules.
+        :param line_range: A tuple of the first and the last line (both
+            inclusive). Only the issues within these lines are returned and
+            only the statements overlapping them are checked, e.g. to check
+            the visible part of a file in an editor.
+        :param int max_issues: Stops checking as soon as this number of issues
+            was found, e.g. ``max_issues=1`` only returns the first issue. The
+            issues are the same as the first ones without it. It needs to be at
+            least 1.
         """
         if self._error_normalizer_config is None:
             raise ValueError("No error normalizer specified for this grammar.")
 
-        return self._get_normalizer_issues(node, self._error_normalizer_config)
+        if incremental:
+            if line_range is not None or max_issues is not None:
+                raise ValueError("A line range or max_issues cannot be used for "
+                                 "incremental error checking.")
+            if node.type != 'file_input':
+                raise ValueError("Incremental error checking only works for modules.")
+            with self._use_normalizer(self._error_normalizer_config) as normalizer:
+                # The issues are different for different Python versions.
+                version, cache = node._error_cache or (None, {})
+                if version != normalizer.version:
+                    cache = {}
+                node._error_cache = normalizer.version, normalizer.walk_with_cache(node, cache)
+                return normalizer.issues
+
+        return self._get_normalizer_issues(
+            node, self._error_normalizer_config, line_range, max_issues)
+
+    def check_files(self, paths: Iterable[Union[str, os.PathLike]], *,
+                    workers: Optional[int] = None,
+                    normalizer_config: Optional[NormalizerConfig] = None
+                    ) -> Iterator[Tuple[Union[str, os.PathLike],
+                                        Union[List[Issue], Exception]]]:
+        """
+        Checks a lot of files in a process pool and yields ``(path, issues)``
+        tuples. The results are yielded as soon as the files are checked and
+        are therefore not in the order of ``paths``. If a file can't be
+        checked (e.g. because it doesn't exist or can't be decoded), the
+        exception is yielded instead of the issues and the other files are
+        still checked.
+
+        :param workers: The number of processes, by default the number of
+            CPUs. With one worker the files are checked in this process.
+        :param normalizer_config: The issues of this normalizer config (e.g.
+            a :py:class:`parso.python.pep8.PEP8NormalizerConfig`) are used
+            instead of :py:meth:`iter_errors`.
+        """
+        paths = list(paths)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers == 1:
+            for path in paths:
+                yield path, self._check_file(path, normalizer_config)
+            return
+
+        with ProcessPoolExecutor(workers) as executor:
+            # Use a few files per task to reduce the overhead of the tasks.
+            chunk_size = max(1, min(_MAX_CHECK_FILES_CHUNK_SIZE, len(paths) // (workers * 4)))
+            futures = [
+                executor.submit(_check_files, self, paths[i:i + chunk_size], normalizer_config)
+                for i in range(0, len(paths), chunk_size)
+            ]
+            for future in as_completed(futures):
+                yield from future.result()
+
+    def _check_file(self, path, normalizer_config):
+        try:
+            module = self.parse(path=path)
+            if normalizer_config is None:
+                return self.iter_errors(module)
+            return self._get_normalizer_issues(module, normalizer_config)
+        except Exception as e:
+            # One broken file shouldn't stop checking all the others.
+            return e
 
-    def refactor(self, base_node, node_to_str_map):
-        return RefactoringNormalizer(node_to_str_map).walk(base_node)
+    def refactor(self, base_node, node_to_str_map, *, as_edits=False):
+        """
+        Returns the code of ``base_node`` with the nodes of
+        ``node_to_str_map`` replaced by their strings (including their prefix).
+
+        :param as_edits: Returns a sorted list of ``(start_pos, end_pos,
+            new_text)`` tuples instead of the code. The positions refer to the
+            original code, so apply them in reverse order (e.g. with
+            ``parse(edits=reversed(edits), diff_cache=True)``). This only
+            looks at the replaced nodes and is therefore a lot faster for a
+            few replacements in a big module.
+        """
+        normalizer = RefactoringNormalizer(node_to_str_map)
+        if as_edits:
+            return normalizer.get_edits(base_node)
+        return normalizer.walk(base_node)
 
     def _get_normalizer(self, normalizer_config):
         if normalizer_config is None:
@@ -190,6 +396,27 @@ class Grammar(Generic[_NodeT]):
                                  "there's no default normalizer for this tree.")
         return normalizer_config.create_normalizer(self)
 
+    @contextmanager
+    def _use_normalizer(self, normalizer_config):
+        """
+        The normalizers of the error normalizer config are reused, because
+        creating their rules takes longer than checking small files.
+        """
+        if normalizer_config is None or normalizer_config is not self._error_normalizer_config:
+            yield self._get_normalizer(normalizer_config)
+            return
+
+        try:
+            normalizer = self._error_finders.pop()
+        except IndexError:
+            normalizer = self._get_normalizer(normalizer_config)
+        try:
+            yield normalizer
+        finally:
+            # The grammar lives as long as the process, the trees shouldn't.
+            normalizer._release_nodes()
+            self._error_finders.append(normalizer)
+
     def _normalize(self, node, normalizer_config=None):
         """
         TODO this is not public, yet.
@@ -198,10 +425,18 @@ class Grammar(Generic[_NodeT]):
         normalizer = self._get_normalizer(normalizer_config)
         return normalizer.walk(node)
 
-    def _get_normalizer_issues(self, node, normalizer_config=None):
-        normalizer = self._get_normalizer(normalizer_config)
-        normalizer.walk(node)
-        return normalizer.issues
+    def _get_normalizer_issues(self, node, normalizer_config=None, line_range=None,
+                               max_issues=None):
+        with self._use_normalizer(normalizer_config) as normalizer:
+            if line_range is None and max_issues is None:
+                normalizer.check(node)
+                return normalizer.issues
+
+            normalizer.check(node, line_range=line_range, max_issues=max_issues)
+        if line_range is None:
+            return normalizer.issues
+        first_line, last_line = line_range
+        return [i for i in normalizer.issues if first_line <= i.start_pos[0] <= last_line]
 
     def __repr__(self):
         nonterminals = self._pgen_grammar.nonterminal_to_dfas.keys()
@@ -222,6 +457,11 @@ class PythonGrammar(Grammar):
             diff_parser=DiffParser
         )
         self.version_info = version_info
+        self._bnf_text = bnf_text
+
+    def __reduce__(self):
+        # Used to send the grammar to other processes (see check_files).
+        return _load_pickled_grammar, (self.version_info, self._bnf_text)
 
     def _tokenize_lines(self, lines, **kwargs) -> Iterator[PythonToken]:
         return tokenize_lines(lines, version_info=self.version_info, **kwargs)
@@ -231,6 +471,19 @@ class PythonGrammar(Grammar):
         return tokenize(code, version_info=self.version_info)
 
 
+def _load_pickled_grammar(version_info, bnf_text):
+    key = version_info.major, version_info.minor, bnf_text
+    try:
+        return _pickled_grammars[key]
+    except KeyError:
+        return _pickled_grammars.setdefault(key, PythonGrammar(version_info, bnf_text))
+
+
+def _check_files(grammar, paths, normalizer_config):
+    # Runs in the worker processes of Grammar.check_files.
+    return [(path, grammar._check_file(path, normalizer_config)) for path in paths]
+
+
 def load_grammar(*, version: str = None, path: str = None):
     """
     Loads a :py:class:`parso.Grammar`. The default version is the current Python
@@ -1,5 +1,8 @@
+import sys
 from contextlib import contextmanager
-from typing import Dict, List, Any
+from typing import Dict, Tuple, Any
+
+from parso.tree import Leaf
 
 
 class _NormalizerMeta(type):
@@ -10,44 +13,162 @@ class _NormalizerMeta(type):
         new_cls = type.__new__(cls, name, bases, dct)
         new_cls.rule_value_classes = {}
         new_cls.rule_type_classes = {}
+        new_cls._rule_tables = None
         return new_cls
 
 
 class Normalizer(metaclass=_NormalizerMeta):
-    _rule_type_instances: Dict[str, List[type]] = {}
-    _rule_value_instances: Dict[str, List[type]] = {}
+    _rule_type_instances: Dict[str, Tuple['Rule', ...]] = {}
+    _rule_value_instances: Dict[str, Tuple['Rule', ...]] = {}
+    # Changes whenever a rule is registered, so that the rule tables of all
+    # normalizer classes are compiled again.
+    _rule_registrations = 0
 
     def __init__(self, grammar, config):
         self.grammar = grammar
         self._config = config
         self.issues = []
 
-        self._rule_type_instances = self._instantiate_rules('rule_type_classes')
-        self._rule_value_instances = self._instantiate_rules('rule_value_classes')
+        type_table, value_table = self._get_rule_tables()
+        # Every rule is instantiated once and then used for all walks. Rules
+        # with disabled codes are not used at all.
+        rules = {}
+        for rule_classes in list(type_table.values()) + list(value_table.values()):
+            for rule_cls in rule_classes:
+                if rule_cls not in rules:
+                    code = getattr(rule_cls, 'code', None)
+                    if code is None or config.is_code_enabled(code):
+                        rules[rule_cls] = rule_cls(self)
+                    else:
+                        rules[rule_cls] = None
+        self._rule_type_instances = self._create_rule_instances(type_table, rules)
+        self._rule_value_instances = self._create_rule_instances(value_table, rules)
+
+    @staticmethod
+    def _create_rule_instances(table, rules):
+        dct = {}
+        for key, rule_classes in table.items():
+            instances = tuple(rules[c] for c in rule_classes if rules[c] is not None)
+            if instances:
+                dct[key] = instances
+        return dct
+
+    @classmethod
+    def _get_rule_tables(cls):
+        """
+        Returns the registered rule classes of this class and its bases as
+        two dicts (by type and by value) of tuples. They are only compiled
+        once per class.
+        """
+        tables = cls._rule_tables
+        if tables is None or tables[0] != Normalizer._rule_registrations:
+            tables = Normalizer._rule_registrations, tuple(
+                cls._compile_rule_table(attr)
+                for attr in ('rule_type_classes', 'rule_value_classes')
+            )
+            cls._rule_tables = tables
+        return tables[1]
 
-    def _instantiate_rules(self, attr):
+    @classmethod
+    def _compile_rule_table(cls, attr):
         dct = {}
-        for base in type(self).mro():
+        for base in cls.mro():
             rules_map = getattr(base, attr, {})
-            for type_, rule_classes in rules_map.items():
-                new = [rule_cls(self) for rule_cls in rule_classes]
-                dct.setdefault(type_, []).extend(new)
-        return dct
+            for key, rule_classes in rules_map.items():
+                dct.setdefault(key, []).extend(rule_classes)
+        return {key: tuple(rule_classes) for key, rule_classes in dct.items()}
 
     def walk(self, node):
+        """
+        Checks the node and returns its code.
+        """
         self.initialize(node)
         value = self.visit(node)
         self.finalize()
         return value
 
+    def check(self, node):
+        """
+        Works like :py:meth:`walk`, but only collects the issues. No code is
+        built, which is a lot faster for big trees.
+        """
+        self.initialize(node)
+        self._visit(node)
+        self.finalize()
+
     def visit(self, node):
-        try:
-            children = node.children
-        except AttributeError:
+        """
+        Returns the code of the node. Only called for the node that is
+        walked, the nodes below it are not visited with this method, but
+        with :py:meth:`visit_node` and :py:meth:`visit_leaf`. Override those
+        to intercept nodes.
+        """
+        if isinstance(node, Leaf):
             return self.visit_leaf(node)
-        else:
-            with self.visit_node(node):
-                return ''.join(self.visit(child) for child in children)
+
+        parts = []
+        self._visit(node, parts.append)
+        return ''.join(parts)
+
+    def _visit(self, node, append=None):
+        """
+        Visits the node and passes the code of its leaves (or of nodes whose
+        children are not visited) to ``append``. If ``append`` is None, the
+        leaves are only checked.
+        """
+        # Nodes are visited with an explicit stack instead of recursion,
+        # otherwise deeply nested code would hit the recursion limit.
+        # Contains the children iterators of the parent nodes and the context
+        # managers of the parent nodes that need to be closed afterwards.
+        stack = []
+        iterator = iter((node,))
+        try:
+            while True:
+                for child in iterator:
+                    if isinstance(child, Leaf):
+                        if append is None:
+                            self._check_leaf(child)
+                        else:
+                            append(self.visit_leaf(child))
+                        continue
+
+                    code = self._visit_without_children(child)
+                    if code is not None:
+                        if append is not None:
+                            append(code)
+                        continue
+
+                    context = self.visit_node(child)
+                    context.__enter__()
+                    stack.append((iterator, context))
+                    iterator = iter(self._get_visited_children(child))
+                    break
+                else:
+                    if not stack:
+                        return
+                    iterator, context = stack.pop()
+                    context.__exit__(None, None, None)
+        except BaseException:
+            # Close the contexts of the parent nodes like nested with
+            # statements would.
+            exc_info = sys.exc_info()
+            while stack:
+                iterator, context = stack.pop()
+                context.__exit__(*exc_info)
+            raise
+
+    def _visit_without_children(self, node):
+        """
+        Returns the code of a node if its children should not be visited,
+        otherwise None.
+        """
+        return None
+
+    def _get_visited_children(self, node):
+        """
+        Returns the children of a node that are visited.
+        """
+        return node.children
 
     @contextmanager
     def visit_node(self, node):
@@ -55,24 +176,39 @@ class Normalizer(metaclass=_NormalizerMeta):
         yield
 
     def _check_type_rules(self, node):
-        for rule in self._rule_type_instances.get(node.type, []):
+        for rule in self._rule_type_instances.get(node.type, ()):
             rule.feed_node(node)
 
     def visit_leaf(self, leaf):
+        self._check_leaf(leaf)
+        return leaf.prefix + leaf.value
+
+    def _check_leaf(self, leaf):
         self._check_type_rules(leaf)
 
-        for rule in self._rule_value_instances.get(leaf.value, []):
+        for rule in self._rule_value_instances.get(leaf.value, ()):
             rule.feed_node(leaf)
 
-        return leaf.prefix + leaf.value
-
     def initialize(self, node):
-        pass
+        """
+        Is called at the start of every walk. Normalizers can be used for
+        multiple walks, so the state of a walk is reset here.
+        """
+        self.issues = []
 
     def finalize(self):
         pass
 
+    def _release_nodes(self):
+        """
+        Removes the references to the nodes of the last walk, so that a
+        normalizer that is kept for later walks doesn't keep the tree alive.
+        The issues don't reference any nodes and stay.
+        """
+
     def add_issue(self, node, code, message):
+        if not self._config.is_code_enabled(code):
+            return False
         issue = Issue(node, code, message)
         if issue not in self.issues:
             self.issues.append(issue)
@@ -103,6 +239,7 @@ class Normalizer(metaclass=_NormalizerMeta):
                 cls.rule_value_classes.setdefault(v, []).append(rule_cls)
             for t in types:
                 cls.rule_type_classes.setdefault(t, []).append(rule_cls)
+            Normalizer._rule_registrations += 1
             return rule_cls
 
         return decorator
@@ -111,11 +248,35 @@ class Normalizer(metaclass=_NormalizerMeta):
 class NormalizerConfig:
     normalizer_class = Normalizer
 
+    def __init__(self, *, include_codes=None, exclude_codes=()):
+        """
+        :param include_codes: The issue codes that are reported. All codes
+            are reported if it's None.
+        :param exclude_codes: The issue codes that are not reported.
+
+        The checks of codes that are not reported are skipped where possible.
+        """
+        self.include_codes = None if include_codes is None else frozenset(include_codes)
+        self.exclude_codes = frozenset(exclude_codes)
+
+    def is_code_enabled(self, code):
+        """
+        Returns True if issues with the given code are reported.
+        """
+        return (self.include_codes is None or code in self.include_codes) \
+            and code not in self.exclude_codes
+
     def create_normalizer(self, grammar):
         return self.normalizer_class(grammar, self)
 
 
 class Issue:
+    """
+    An issue only stores the positions of the node, not the node itself, so
+    issues don't keep syntax trees alive.
+    """
+    __slots__ = ('code', 'message', 'start_pos', 'end_pos')
+
     def __init__(self, node, code, message):
         self.code = code
         """
@@ -191,8 +352,33 @@ class RefactoringNormalizer(Normalizer):
         except KeyError:
             return super().visit(node)
 
+    def _visit_without_children(self, node):
+        return self._node_to_str_map.get(node)
+
     def visit_leaf(self, leaf):
         try:
             return self._node_to_str_map[leaf]
         except KeyError:
             return super().visit_leaf(leaf)
+
+    def get_edits(self, base_node):
+        """
+        Returns the changes of :py:meth:`walk` as a sorted list of
+        ``(start_pos, end_pos, new_text)`` tuples without walking the tree.
+        The positions are the positions in the tree and include the prefix
+        of the replaced nodes. Replacements within other replaced nodes are
+        ignored like in :py:meth:`walk`.
+        """
+        edits = []
+        for node, text in self._node_to_str_map.items():
+            # Only the ancestors are checked, so the cost depends on the
+            # number of replacements and not on the size of the tree.
+            parent = node
+            while parent is not base_node:
+                parent = parent.parent
+                if parent is None or parent in self._node_to_str_map:
+                    break
+            else:
+                edits.append((node.get_start_pos_of_prefix(), node.end_pos, text))
+        edits.sort(key=lambda edit: (edit[0], edit[1]))
+        return edits
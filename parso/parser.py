@@ -143,13 +143,59 @@ class BaseParser:
             else:
                 return self.convert_node(tos.nonterminal, tos.nodes)
 
+    def recognize(self, tokens):
+        """
+        Works like :py:meth:`parse` without error recovery, but only checks
+        the tokens and doesn't create a tree, which is a lot faster. Raises a
+        :py:class:`ParserSyntaxError` for the first syntax error.
+        """
+        grammar = self._pgen_grammar
+        # The stack only contains the DFAs, there are no nodes.
+        stack = [grammar.nonterminal_to_dfas[self._start_nonterminal][0]]
+        token = previous_token = None
+        for token in tokens:
+            type_, value, start_pos, prefix = token
+            transition = _token_to_transition(grammar, type_, value)
+            while True:
+                try:
+                    plan = stack[-1].transitions[transition]
+                except KeyError:
+                    if stack[-1].is_final:
+                        stack.pop()
+                    else:
+                        # Raises an error or changes the stack so that the
+                        # token can be used.
+                        self._recognize_error(stack, token, previous_token)
+                    continue
+                except IndexError:
+                    raise InternalParseError("too much input", type_, value, start_pos)
+                break
+
+            stack[-1] = plan.next_dfa
+            stack += plan.dfa_pushes
+            previous_token = token
+
+        if not all(dfa.is_final for dfa in stack):
+            raise InternalParseError(
+                "incomplete input", token.type, token.string, token.start_pos
+            )
+
+    def _recognize_error(self, stack, token, previous_token):
+        """
+        Is called by :py:meth:`recognize` if the token cannot be used.
+        """
+        self._raise_syntax_error(token)
+
     def error_recovery(self, token):
         if self._error_recovery:
             raise NotImplementedError("Error Recovery is not implemented")
         else:
-            type_, value, start_pos, prefix = token
-            error_leaf = tree.ErrorLeaf(type_, value, start_pos, prefix)
-            raise ParserSyntaxError('SyntaxError: invalid syntax', error_leaf)
+            self._raise_syntax_error(token)
+
+    def _raise_syntax_error(self, token):
+        type_, value, start_pos, prefix = token
+        error_leaf = tree.ErrorLeaf(type_, value, start_pos, prefix)
+        raise ParserSyntaxError('SyntaxError: invalid syntax', error_leaf)
 
     def convert_node(self, nonterminal, children):
         try:
@@ -3,8 +3,8 @@ The diff parser is trying to be a faster version of the normal parser by trying
 to reuse the nodes of a previous pass over the same file. This is also called
 incremental parsing in parser literature. The difference is mostly that with
 incremental parsing you get a range that needs to be reparsed. Here we
-calculate that range ourselves by using difflib. After that it's essentially
-incremental parsing.
+calculate that range ourselves by diffing the lines. After that it's
+essentially incremental parsing.
 
 The biggest issue of this approach is that we reuse nodes in a mutable way. The
 intial design and idea is quite problematic for this parser, but it is also
@@ -31,12 +31,16 @@ from collections import namedtuple
 import logging
 
 from parso.utils import split_lines
+from parso.tree import BaseNode, Leaf
 from parso.python.parser import Parser
-from parso.python.tree import EndMarker
+from parso.python.tree import EndMarker, Module, Name, UsedNamesMapping
 from parso.python.tokenize import PythonToken, BOM_UTF8_STRING
 from parso.python.token import PythonTokenTypes
 
 LOG = logging.getLogger(__name__)
+# Finding the middle of an edit script is O(D**2) for an edit distance D. For
+# bigger distances (e.g. when a whole file is reindented) difflib is faster.
+_MAX_BISECT_DISTANCE = 200
 DEBUG_DIFF_PARSER = False
 
 _INDENTATION_TOKENS = 'INDENT', 'ERROR_DEDENT', 'DEDENT'
@@ -230,31 +234,411 @@ def _is_flow_node(node):
     return value in ('if', 'for', 'while', 'try', 'with')
 
 
+def _assert_used_names_are_equal(used_names1, used_names2):
+    assert sorted(used_names1) == sorted(used_names2)
+    for key, names in used_names1.items():
+        assert [n.start_pos for n in names] \
+            == [n.start_pos for n in used_names2[key]], key
+
+
+def _iter_removed_names(removed_nodes):
+    """
+    Returns the names of the nodes that were removed from the tree. Children of
+    removed nodes that were moved to a different part of the tree have a
+    different parent, so they are skipped.
+    """
+    stack = list(removed_nodes)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Leaf):
+            if node.type == 'name':
+                yield node
+        else:
+            stack += [child for child in node.children if child.parent is node]
+
+
+def _update_used_names(used_names, removed_names, added_names):
+    """
+    Returns a new used names mapping without the removed and with the added
+    names. Lists of names that don't change are reused.
+    """
+    removed_ids = {}
+    for name in removed_names:
+        removed_ids.setdefault(name.value, set()).add(id(name))
+    added = {}
+    for name in added_names:
+        added.setdefault(name.value, []).append(name)
+
+    dct = dict(used_names)
+    for value in set(removed_ids) | set(added):
+        ids = removed_ids.get(value, ())
+        names = [n for n in dct.get(value, ()) if id(n) not in ids]
+        new_names = added.get(value)
+        if new_names is not None:
+            names += new_names
+            names.sort(key=lambda n: (n.line, n.column))
+        if names:
+            dct[value] = names
+        else:
+            dct.pop(value, None)
+    return UsedNamesMapping(dct)
+
+
+def _apply_edit(lines, start_pos, end_pos, text):
+    """
+    Applies the edit to the lines (in place) and returns the index of the
+    first changed line and the indexes after the last changed line before and
+    after the edit.
+    """
+    (start_line, start_column), (end_line, end_column) = start_pos, end_pos
+    if not (1, 0) <= start_pos <= end_pos or end_line > len(lines) \
+            or start_column > len(lines[start_line - 1].rstrip('\r\n')) \
+            or end_column > len(lines[end_line - 1].rstrip('\r\n')):
+        raise ValueError('Invalid edit range %s-%s' % (start_pos, end_pos))
+
+    start = start_line - 1
+    end = end_line
+    code = lines[start][:start_column] + text + lines[end - 1][end_column:]
+    if start > 0 and lines[start - 1].endswith('\r') and code.startswith('\n'):
+        # The \r and \n form a single newline now.
+        start -= 1
+        code = lines[start] + code
+    # Lines need to end with a newline, except the last one.
+    while end < len(lines) and (
+            not code.endswith(('\n', '\r'))
+            or code.endswith('\r') and lines[end].startswith('\n')):
+        code += lines[end]
+        end += 1
+
+    new = split_lines(code, keepends=True)
+    if end < len(lines):
+        # The code ends with a newline, the empty string after it is actually
+        # the start of the next line.
+        new.pop()
+    lines[start:end] = new
+    return start, end, start + len(new)
+
+
+def _apply_edits(old_lines, edits):
+    """
+    Returns the new lines and the opcodes of the change (like
+    :py:meth:`difflib.SequenceMatcher.get_opcodes`).
+    """
+    lines = list(old_lines)
+    # All lines before `first` and the last `unchanged_tail` lines are the
+    # same in all versions of the lines.
+    first = len(lines)
+    unchanged_tail = len(lines)
+    for start_pos, end_pos, text in edits:
+        line_count = len(lines)
+        start, old_end, new_end = _apply_edit(lines, start_pos, end_pos, text)
+        first = min(first, start)
+        unchanged_tail = min(unchanged_tail, line_count - old_end)
+
+    old_end = len(old_lines) - unchanged_tail
+    new_end = len(lines) - unchanged_tail
+    opcodes = []
+    if first > 0:
+        opcodes.append(('equal', 0, first, 0, first))
+    # Only the changed part needs to be compared.
+    for operation, i1, i2, j1, j2 in _get_opcodes(old_lines[first:old_end],
+                                                  lines[first:new_end]):
+        opcodes.append((operation, i1 + first, i2 + first, j1 + first, j2 + first))
+    if unchanged_tail:
+        opcodes.append(('equal', old_end, len(old_lines), new_end, len(lines)))
+    return lines, opcodes
+
+
+def _get_opcodes(old_lines, new_lines):
+    """
+    Returns the opcodes (like :py:meth:`difflib.SequenceMatcher.get_opcodes`)
+    of a line diff between the old and the new lines.
+
+    This is Myers' linear space diff, which is a lot faster than difflib for
+    big files and doesn't suffer from its junk heuristics (there are a lot of
+    blank lines and lines like ``pass`` in Python code).
+    """
+    old_count = len(old_lines)
+    new_count = len(new_lines)
+    blocks = []
+    # The fast path: usually there's only one contiguous change and
+    # everything around it is equal.
+    start = 0
+    end = min(old_count, new_count)
+    while start < end and old_lines[start] == new_lines[start]:
+        start += 1
+    if start:
+        blocks.append((0, 0, start))
+    tail = 0
+    end -= start
+    while tail < end and old_lines[old_count - tail - 1] == new_lines[new_count - tail - 1]:
+        tail += 1
+
+    if start < old_count - tail and start < new_count - tail:
+        # Lines are compared as integers, which is faster than comparing
+        # strings.
+        ids = {}
+        a = [ids.setdefault(line, len(ids)) for line in old_lines[start:old_count - tail]]
+        b = [ids.get(line, -1) for line in new_lines[start:new_count - tail]]
+        _find_matching_blocks(a, 0, len(a), b, 0, len(b), start, blocks)
+    if tail:
+        blocks.append((old_count - tail, new_count - tail, tail))
+
+    opcodes = []
+    i = j = 0
+    for block_i, block_j, size in blocks + [(old_count, new_count, 0)]:
+        if i < block_i and j < block_j:
+            opcodes.append(('replace', i, block_i, j, block_j))
+        elif i < block_i:
+            opcodes.append(('delete', i, block_i, j, j))
+        elif j < block_j:
+            opcodes.append(('insert', i, i, j, block_j))
+        elif size and opcodes and opcodes[-1][0] == 'equal':
+            # Merge adjacent blocks.
+            block_i, block_j = opcodes.pop()[1:4:2]
+        i = block_i + size
+        j = block_j + size
+        if size:
+            opcodes.append(('equal', block_i, i, block_j, j))
+    return opcodes
+
+
+def _find_matching_blocks(a, a_start, a_end, b, b_start, b_end, offset, blocks):
+    while True:
+        # Strip equal lines at the start and the end, finding the middle of
+        # the edit script is much more expensive.
+        start_count = 0
+        while a_start < a_end and b_start < b_end and a[a_start] == b[b_start]:
+            a_start += 1
+            b_start += 1
+            start_count += 1
+        if start_count:
+            blocks.append((a_start - start_count + offset, b_start - start_count + offset,
+                           start_count))
+        end_count = 0
+        while a_start < a_end and b_start < b_end and a[a_end - 1] == b[b_end - 1]:
+            a_end -= 1
+            b_end -= 1
+            end_count += 1
+
+        if a_start < a_end and b_start < b_end:
+            split = _bisect(a, a_start, a_end, b, b_start, b_end)
+            if split is False:
+                sm = difflib.SequenceMatcher(None, a[a_start:a_end], b[b_start:b_end])
+                for i, j, size in sm.get_matching_blocks()[:-1]:
+                    blocks.append((a_start + i + offset, b_start + j + offset, size))
+            elif split is not None:
+                x, y = split
+                _find_matching_blocks(a, a_start, x, b, b_start, y, offset, blocks)
+                if not end_count:
+                    # Avoid recursing for the second half.
+                    a_start = x
+                    b_start = y
+                    continue
+                _find_matching_blocks(a, x, a_end, b, y, b_end, offset, blocks)
+        if end_count:
+            blocks.append((a_end + offset, b_end + offset, end_count))
+        return
+
+
+def _bisect(a, a_start, a_end, b, b_start, b_end):
+    """
+    Returns a point in the middle of the shortest edit script or None if there
+    are no equal lines, see "An O(ND) Difference Algorithm and Its Variations"
+    by Eugene W. Myers. Returns False if the edit script is too long.
+    """
+    n = a_end - a_start
+    m = b_end - b_start
+    max_d = (n + m + 1) // 2
+    delta = n - m
+    # If the total number of lines is odd, the forward path collides with the
+    # reverse path.
+    front = delta % 2 != 0
+    # Both are indexed by diagonals (offset by max_d) and contain the
+    # furthest reaching x values, counted from the start and the end.
+    forward = [-1] * (2 * max_d + 2)
+    backward = [-1] * (2 * max_d + 2)
+    forward[max_d + 1] = 0
+    backward[max_d + 1] = 0
+    # Offsets for the diagonals that already left the grid.
+    forward_start = forward_end = backward_start = backward_end = 0
+    for d in range(max_d):
+        if d > _MAX_BISECT_DISTANCE:
+            return False
+        for k in range(-d + forward_start, d + 1 - forward_end, 2):
+            index = max_d + k
+            if k == -d or k != d and forward[index - 1] < forward[index + 1]:
+                x = forward[index + 1]
+            else:
+                x = forward[index - 1] + 1
+            y = x - k
+            while x < n and y < m and a[a_start + x] == b[b_start + y]:
+                x += 1
+                y += 1
+            forward[index] = x
+            if x > n:
+                forward_end += 2
+            elif y > m:
+                forward_start += 2
+            elif front:
+                reverse_index = max_d + delta - k
+                if 0 <= reverse_index < len(backward) and backward[reverse_index] != -1 \
+                        and x >= n - backward[reverse_index]:
+                    return a_start + x, b_start + y
+
+        for k in range(-d + backward_start, d + 1 - backward_end, 2):
+            index = max_d + k
+            if k == -d or k != d and backward[index - 1] < backward[index + 1]:
+                x = backward[index + 1]
+            else:
+                x = backward[index - 1] + 1
+            y = x - k
+            while x < n and y < m and a[a_end - x - 1] == b[b_end - y - 1]:
+                x += 1
+                y += 1
+            backward[index] = x
+            if x > n:
+                backward_end += 2
+            elif y > m:
+                backward_start += 2
+            elif not front:
+                forward_index = max_d + delta - k
+                if 0 <= forward_index < len(forward) and forward[forward_index] != -1:
+                    forward_x = forward[forward_index]
+                    if forward_x >= n - x:
+                        return (a_start + forward_x,
+                                b_start + forward_x - (forward_index - max_d))
+    return None
+
+
+class DiffChanges:
+    """
+    Describes how the diff parser changed a module. Caches that are based on
+    nodes can use this to only invalidate the parts of a module that changed.
+
+    .. attribute:: reused
+
+        A list of ``(node, line_offset)`` tuples of the nodes that were
+        reused. Their positions were moved by ``line_offset`` lines. The last
+        node might be a function or a class with a suite that was only
+        partially reused, the rest of the suite is then part of ``added``.
+
+    .. attribute:: added
+
+        A list of the nodes that were newly created.
+
+    .. attribute:: removed
+
+        A list of the nodes that are not part of the module anymore. Their
+        ``parent`` is still the node they were removed from.
+    """
+    def __init__(self, reused, added, removed):
+        self.reused = reused
+        self.added = added
+        self.removed = removed
+
+    def __repr__(self):
+        return '<%s: reused=%s added=%s removed=%s>' % (
+            self.__class__.__name__, len(self.reused), len(self.added), len(self.removed))
+
+
+def _get_slot_names(cls):
+    try:
+        return _slot_names[cls]
+    except KeyError:
+        names = _slot_names[cls] = tuple(
+            name
+            for c in cls.__mro__
+            for name in getattr(c, '__slots__', ())
+            if name not in ('parent', 'children')
+        )
+        return names
+
+
+_slot_names = {}
+
+
+def _copy_module(module):
+    """
+    Returns a copy of the module that doesn't share any nodes. This is a lot
+    faster than ``copy.deepcopy``.
+    """
+    new_module = Module.__new__(Module)
+    new_module.parent = None
+    new_module._leaf_index = None
+    new_module._leaf_lookups = 0
+    new_module._type_index = None
+    new_module._symbol_tables = None
+    new_module._diff_changes = None
+    # The error cache doesn't depend on the nodes and is never changed.
+    new_module._error_cache = module._error_cache
+    copy_names = module._used_names is not None
+    names = {}
+
+    slot_names = _slot_names
+    new = object.__new__
+    stack = [(module, new_module)]
+    while stack:
+        node, new_node = stack.pop()
+        new_children = []
+        for child in node.children:
+            cls = child.__class__
+            new_child = new(cls)
+            try:
+                attributes = slot_names[cls]
+            except KeyError:
+                attributes = _get_slot_names(cls)
+            for attribute in attributes:
+                setattr(new_child, attribute, getattr(child, attribute))
+            new_child.parent = new_node
+            new_children.append(new_child)
+            if isinstance(child, Leaf):
+                if copy_names and cls is Name:
+                    names[id(child)] = new_child
+            else:
+                stack.append((child, new_child))
+        new_node.children = new_children
+
+    if copy_names:
+        new_module._used_names = UsedNamesMapping({
+            key: [names[id(name)] for name in value]
+            for key, value in module._used_names.items()
+        })
+    else:
+        new_module._used_names = None
+    return new_module
+
+
 class _PositionUpdatingFinished(Exception):
     pass
 
 
 def _update_positions(nodes, line_offset, last_leaf):
     for node in nodes:
-        try:
-            children = node.children
-        except AttributeError:
-            # Is a leaf
-            node.line += line_offset
-            if node is last_leaf:
-                raise _PositionUpdatingFinished
+        if isinstance(node, Leaf):
+            leaves = [node]
         else:
-            _update_positions(children, line_offset, last_leaf)
+            leaves = node.iter_leaves()
+        for leaf in leaves:
+            leaf.line += line_offset
+            if leaf is last_leaf:
+                raise _PositionUpdatingFinished
 
 
 class DiffParser:
     """
     An advanced form of parsing a file faster. Unfortunately comes with huge
-    side effects. It changes the given module.
+    side effects. It changes the given module, unless ``snapshot`` is True.
+    Then a copy of the module is changed and the given module stays valid.
+    If ``record_changes`` is True, the nodes that were reused, added and
+    removed are available with :py:meth:`parso.python.tree.Module.get_diff_changes`.
     """
-    def __init__(self, pgen_grammar, tokenizer, module):
+    def __init__(self, pgen_grammar, tokenizer, module, snapshot=False, record_changes=False):
         self._pgen_grammar = pgen_grammar
         self._tokenizer = tokenizer
+        self._record_changes = record_changes
+        if snapshot:
+            module = _copy_module(module)
         self._module = module
 
     def _reset(self):
@@ -279,17 +663,44 @@ class DiffParser:
 
         Returns the new module node.
         '''
+        return self._update(old_lines, new_lines, _get_opcodes(old_lines, new_lines))
+
+    def apply_edits(self, old_lines, edits):
+        '''
+        Works like :py:meth:`update`, but the changes are given as a list of
+        edits instead of the new lines. Only the lines that are touched by the
+        edits are compared, so this is cheap for big files (e.g. with the
+        incremental text synchronization of the Language Server Protocol).
+
+        :param edits: A list of ``(start_pos, end_pos, new_text)`` tuples that
+            are applied one after another. Positions are parso positions
+            (lines start at 1, columns at 0) in the code as it is after all
+            previous edits.
+
+        Returns the new module node and the new lines.
+        '''
+        new_lines, opcodes = _apply_edits(old_lines, edits)
+        return self._update(old_lines, new_lines, opcodes), new_lines
+
+    def _update(self, old_lines, new_lines, opcodes):
         LOG.debug('diff parser start')
-        # Reset the used names cache so they get regenerated.
+        # The used names are updated with the names of the nodes that are
+        # removed and parsed, if they have been calculated before.
+        used_names = self._module._used_names
+        # Reset the caches and the indexes so they get regenerated.
         self._module._used_names = None
+        self._module._leaf_index = None
+        self._module._leaf_lookups = 0
+        self._module._type_index = None
+        self._module._symbol_tables = None
+        self._module._diff_changes = None
 
         self._parser_lines_new = new_lines
 
         self._reset()
+        self._added_names = None if used_names is None else []
 
         line_length = len(new_lines)
-        sm = difflib.SequenceMatcher(None, old_lines, self._parser_lines_new)
-        opcodes = sm.get_opcodes()
         LOG.debug('line_lengths old: %s; new: %s' % (len(old_lines), line_length))
 
         for operation, i1, i2, j1, j2 in opcodes:
@@ -314,6 +725,25 @@ class DiffParser:
         # changed module.
         self._nodes_tree.close()
 
+        removed_nodes = [
+            node for node, old_parent in self._nodes_tree.removed_nodes
+            # Skip nodes that were moved to a different parent.
+            if node.parent is old_parent
+        ]
+        if self._record_changes:
+            self._module._diff_changes = DiffChanges(
+                self._nodes_tree.reused_nodes,
+                self._nodes_tree.added_nodes,
+                removed_nodes,
+            )
+
+        if used_names is not None:
+            self._module._used_names = _update_used_names(
+                used_names,
+                _iter_removed_names(removed_nodes),
+                self._added_names,
+            )
+
         if DEBUG_DIFF_PARSER:
             # If there is reasonable suspicion that the diff parser is not
             # behaving well, this should be enabled.
@@ -326,6 +756,11 @@ class DiffParser:
                     error_recovery=True
                 ).parse(self._tokenizer(new_lines))
                 _assert_nodes_are_equal(self._module, without_diff_parser_module)
+                if used_names is not None:
+                    _assert_used_names_are_equal(
+                        self._module.get_used_names(),
+                        without_diff_parser_module.get_used_names()
+                    )
             except AssertionError:
                 print(_get_debug_error_message(self._module, old_lines, new_lines))
                 raise
@@ -388,7 +823,11 @@ class DiffParser:
             last_until_line = self._nodes_tree.parsed_until_line
 
     def _get_old_line_stmt(self, old_line):
-        leaf = self._module.get_leaf_for_position((old_line, 0), include_prefixes=True)
+        # Don't use the leaf index of the module here, it would need to be
+        # created for every update.
+        leaf = BaseNode.get_leaf_for_position(
+            self._module, (old_line, 0), include_prefixes=True
+        )
 
         if _ends_with_newline(leaf):
             leaf = leaf.get_next_leaf()
@@ -413,6 +852,10 @@ class DiffParser:
         while until_line > self._nodes_tree.parsed_until_line:
             node = self._try_parse_part(until_line)
             nodes = node.children
+            if self._added_names is not None:
+                self._added_names += [
+                    leaf for leaf in node.iter_leaves() if leaf.type == 'name'
+                ]
 
             self._nodes_tree.add_parsed_nodes(nodes, self._keyword_token_indents)
             if self._replace_tos_indent is not None:
@@ -526,7 +969,8 @@ class _NodesTreeNode:
         self._node_children = []
         self.indentation = indentation
 
-    def finish(self):
+    def finish(self, removed_nodes):
+        old_children = self.tree_node.children
         children = []
         for prefix, children_part, line_offset, last_line_offset_leaf in self._children_groups:
             first_leaf = _get_next_leaf_if_indentation(
@@ -546,8 +990,15 @@ class _NodesTreeNode:
         for node in children:
             node.parent = self.tree_node
 
+        # Remember the old children that are not used anymore. Some of them
+        # might still be used by other nodes, which is checked later.
+        kept = set(map(id, children))
+        removed_nodes += [
+            (node, self.tree_node) for node in old_children if id(node) not in kept
+        ]
+
         for node_child in self._node_children:
-            node_child.finish()
+            node_child.finish(removed_nodes)
 
     def add_child_node(self, child_node):
         self._node_children.append(child_node)
@@ -597,6 +1048,9 @@ class _NodesTree:
         self._prefix_remainder = ''
         self.prefix = ''
         self.indents = [0]
+        self.removed_nodes = []
+        self.reused_nodes = []
+        self.added_nodes = []
 
     @property
     def parsed_until_line(self):
@@ -616,6 +1070,7 @@ class _NodesTree:
             return
 
         assert tree_nodes[0].type != 'newline'
+        self.added_nodes += tree_nodes
 
         node = self._update_insertion_node(tree_nodes[0].start_pos[1])
         assert node.tree_node.type in ('suite', 'file_input')
@@ -712,6 +1167,7 @@ class _NodesTree:
         )
         if new_nodes:
             self.indents += added_indents
+            self.reused_nodes += [(node, line_offset) for node in new_nodes]
         else:
             self._working_stack = old_working_stack
             self.prefix = old_prefix
@@ -861,7 +1317,7 @@ class _NodesTree:
         return new_nodes, working_stack, prefix, added_indents
 
     def close(self):
-        self._base_node.finish()
+        self._base_node.finish(self.removed_nodes)
 
         # Add an endmarker.
         try:
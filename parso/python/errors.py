@@ -3,6 +3,7 @@ import codecs
 import sys
 import warnings
 import re
+from collections import namedtuple
 from contextlib import contextmanager
 
 from parso.normalizer import Normalizer, NormalizerConfig, Issue, Rule
@@ -18,6 +19,8 @@ ALLOWED_FUTURES = (
     'with_statement', 'print_function', 'unicode_literals', 'generator_stop',
 )
 _COMP_FOR_TYPES = ('comp_for', 'sync_comp_for')
+# The positions of a cached issue, used instead of a node.
+_IssuePosition = namedtuple('_IssuePosition', 'start_pos end_pos')
 
 
 def _get_rhs_name(node, version):
@@ -376,6 +379,12 @@ class _Context:
         self._nonlocal_names_in_subscopes += child_context.finalize()
 
 
+class _IssueLimitReached(Exception):
+    """
+    Stops the walk of an :py:class:`ErrorFinder` early.
+    """
+
+
 class ErrorFinder(Normalizer):
     """
     Searches for errors in the syntax tree.
@@ -384,8 +393,96 @@ class ErrorFinder(Normalizer):
         super().__init__(*args, **kwargs)
         self._error_dict = {}
         self.version = self.grammar.version_info
+        # Used by walk_with_cache to find the issues of a statement.
+        self._statement_issues = None
+        self._depends_on_other_statements = False
+        self._line_range = None
+        self._max_issues = None
+
+    def check(self, node, line_range=None, max_issues=None):
+        """
+        :param line_range: A tuple of the first and the last line. Statements
+            of modules and class bodies that are outside of these lines are
+            not visited. Functions are always checked as a whole, because
+            their names depend on each other.
+        :param max_issues: Stops the walk as soon as this number of errors
+            was found. The errors are the same as the first errors of a
+            complete walk.
+        """
+        if max_issues is not None and max_issues < 1:
+            raise ValueError("max_issues needs to be at least 1.")
+        self._line_range = line_range
+        self._max_issues = max_issues
+        try:
+            super().check(node)
+        except _IssueLimitReached:
+            self._create_issues()
+        finally:
+            self._line_range = None
+            self._max_issues = None
+
+    def walk_with_cache(self, module, cache):
+        """
+        Works like :py:meth:`walk`, but only checks the top-level statements
+        of the module that are not in the cache. The cache maps the type and
+        the code of a statement to its issues (relative to the start of the
+        statement).
+        Returns the new cache.
+        """
+        self.initialize(module)
+        module_context = self.context
+        new_cache = {}
+        used_cache = False
+        for child in module.children:
+            start_line, start_column = child.get_start_pos_of_prefix()
+            key = child.type, start_column, child.get_code()
+            issues = cache.get(key)
+            if issues is not None:
+                used_cache = True
+                for code, message, start_pos, end_pos in issues:
+                    self.add_issue(_IssuePosition(
+                        (start_line + start_pos[0], start_pos[1]),
+                        (start_line + end_pos[0], end_pos[1]),
+                    ), code, message)
+                new_cache[key] = issues
+                continue
+
+            counts = (len(module_context._global_names), len(module_context._nonlocal_names),
+                      len(module_context._nonlocal_names_in_subscopes))
+            self._statement_issues = []
+            self._depends_on_other_statements = False
+            self._visit(child)
+            if child.type in ('error_node', 'error_leaf', 'endmarker') \
+                    or self._depends_on_other_statements \
+                    or self.context is not module_context \
+                    or counts != (len(module_context._global_names),
+                                  len(module_context._nonlocal_names),
+                                  len(module_context._nonlocal_names_in_subscopes)):
+                continue
+            end_line = child.end_pos[0]
+            if all(start_line <= node.start_pos[0] and node.end_pos[0] <= end_line
+                   for code, message, node in self._statement_issues):
+                new_cache[key] = [
+                    (code, message,
+                     (node.start_pos[0] - start_line, node.start_pos[1]),
+                     (node.end_pos[0] - start_line, node.end_pos[1]))
+                    for code, message, node in self._statement_issues
+                ]
+        self._statement_issues = None
+
+        if used_cache and (module_context._global_names or module_context._nonlocal_names
+                           or module_context._nonlocal_names_in_subscopes):
+            # Global and nonlocal declarations are checked against all names
+            # and params of the module, but cached statements don't add their
+            # names. Very rare, so just check everything again.
+            return self.walk_with_cache(module, {})
+        self.finalize()
+        return new_cache
 
     def initialize(self, node):
+        super().initialize(node)
+        self._error_dict = {}
+
         def create_context(node):
             if node is None:
                 return None
@@ -399,13 +496,54 @@ class ErrorFinder(Normalizer):
         self._indentation_count = 0
 
     def visit(self, node):
+        code = self._visit_without_children(node)
+        if code is not None:
+            return code
+        return super().visit(node)
+
+    def _visit_without_children(self, node):
         if node.type == 'error_node':
+            # Error nodes look at the next leaf, which might be part of a
+            # different statement.
+            self._depends_on_other_statements = True
             with self.visit_node(node):
                 # Don't need to investigate the inners of an error node. We
                 # might find errors in there that should be ignored, because
                 # the error node itself already shows that there's an issue.
                 return ''
-        return super().visit(node)
+        return None
+
+    def _get_visited_children(self, node):
+        children = node.children
+        if self._line_range is None or node.type != 'file_input' and (
+                node.type != 'suite' or node.parent.type != 'classdef'):
+            return children
+
+        first_line, last_line = self._line_range
+        # Statements are sorted, so search the ones overlapping the lines.
+        low, high = 0, len(children)
+        while low < high:
+            middle = (low + high) // 2
+            if children[middle].end_pos[0] < first_line:
+                low = middle + 1
+            else:
+                high = middle
+        start = low
+        high = len(children)
+        while low < high:
+            middle = (low + high) // 2
+            if children[middle].get_start_pos_of_prefix()[0] <= last_line:
+                low = middle + 1
+            else:
+                high = middle
+
+        # The statement before is visited as well, because some checks (e.g.
+        # the blank lines of PEP8) depend on it.
+        start = max(start - 1, 0)
+        if node.type == 'suite' and start > 0:
+            # The newline after the colon.
+            return children[:1] + children[start:low]
+        return children[start:low]
 
     @contextmanager
     def visit_node(self, node):
@@ -431,8 +569,9 @@ class ErrorFinder(Normalizer):
             self.context = context.parent_context
             self.context.close_child_context(context)
 
-    def visit_leaf(self, leaf):
+    def _check_leaf(self, leaf):
         if leaf.type == 'error_leaf':
+            self._depends_on_other_statements = True
             if leaf.token_type in ('INDENT', 'ERROR_DEDENT'):
                 # Indents/Dedents itself never have a prefix. They are just
                 # "pseudo" tokens that get removed by the syntax tree later.
@@ -463,14 +602,14 @@ class ErrorFinder(Normalizer):
                         else:
                             message = 'EOF while scanning triple-quoted string literal'
                 self._add_syntax_error(leaf, message)
-            return ''
+            return
         elif leaf.value == ':':
             parent = leaf.parent
             if parent.type in ('classdef', 'funcdef'):
                 self.context = self.context.add_context(parent)
 
         # The rest is rule based.
-        return super().visit_leaf(leaf)
+        super()._check_leaf(leaf)
 
     def _add_indentation_error(self, spacing, message):
         self.add_issue(spacing, 903, "IndentationError: " + message)
@@ -480,14 +619,31 @@ class ErrorFinder(Normalizer):
 
     def add_issue(self, node, code, message):
         # Overwrite the default behavior.
+        if not self._config.is_code_enabled(code):
+            return
         # Check if the issues are on the same line.
         line = node.start_pos[0]
+        if self._line_range is not None \
+                and not self._line_range[0] <= line <= self._line_range[1]:
+            return
         args = (code, message, node)
         self._error_dict.setdefault(line, args)
+        if self._statement_issues is not None:
+            self._statement_issues.append(args)
+        if self._max_issues is not None and len(self._error_dict) >= self._max_issues:
+            raise _IssueLimitReached
 
     def finalize(self):
         self.context.finalize()
+        self._create_issues()
+
+    def _release_nodes(self):
+        super()._release_nodes()
+        self.context = None
+        self._error_dict = {}
+        self._statement_issues = None
 
+    def _create_issues(self):
         for code, message, node in self._error_dict.values():
             self.issues.append(Issue(node, code, message))
 
@@ -743,6 +899,8 @@ class _FutureImportRule(SyntaxRule):
 
     def is_issue(self, node):
         if _is_future_import(node):
+            # Checks the statements before this import.
+            self._normalizer._depends_on_other_statements = True
             if not _is_future_import_first(node):
                 return True
 
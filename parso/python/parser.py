@@ -108,33 +108,48 @@ class Parser(BaseParser):
 
         return self._leaf_map.get(type, tree.Operator)(value, start_pos, prefix)
 
-    def error_recovery(self, token):
-        tos_nodes = self.stack[-1].nodes
-        if tos_nodes:
-            last_leaf = tos_nodes[-1].get_last_leaf()
-        else:
-            last_leaf = None
-
+    def _get_missing_newline_dfa(self, dfa, token, last_value):
+        """
+        In Python statements need to end with a newline. But since it's
+        possible (and valid in Python) that there's no newline at the end of
+        a file, we have to recover even if the user doesn't want error
+        recovery. Returns the DFA after the missing newline or None.
+        """
         if self._start_nonterminal == 'file_input' and \
                 (token.type == PythonTokenTypes.ENDMARKER
-                 or token.type == DEDENT and not last_leaf.value.endswith('\n')
-                 and not last_leaf.value.endswith('\r')):
-            # In Python statements need to end with a newline. But since it's
-            # possible (and valid in Python) that there's no newline at the
-            # end of a file, we have to recover even if the user doesn't want
-            # error recovery.
-            if self.stack[-1].dfa.from_rule == 'simple_stmt':
+                 or token.type == DEDENT and not last_value.endswith('\n')
+                 and not last_value.endswith('\r')):
+            if dfa.from_rule == 'simple_stmt':
                 try:
-                    plan = self.stack[-1].dfa.transitions[PythonTokenTypes.NEWLINE]
+                    plan = dfa.transitions[PythonTokenTypes.NEWLINE]
                 except KeyError:
                     pass
                 else:
                     if plan.next_dfa.is_final and not plan.dfa_pushes:
                         # We are ignoring here that the newline would be
                         # required for a simple_stmt.
-                        self.stack[-1].dfa = plan.next_dfa
-                        self._add_token(token)
-                        return
+                        return plan.next_dfa
+        return None
+
+    def _recognize_error(self, stack, token, previous_token):
+        last_value = '' if previous_token is None else previous_token.string
+        dfa = self._get_missing_newline_dfa(stack[-1], token, last_value)
+        if dfa is None:
+            super()._recognize_error(stack, token, previous_token)
+        stack[-1] = dfa
+
+    def error_recovery(self, token):
+        tos_nodes = self.stack[-1].nodes
+        if tos_nodes:
+            last_value = tos_nodes[-1].get_last_leaf().value
+        else:
+            last_value = None
+
+        dfa = self._get_missing_newline_dfa(self.stack[-1].dfa, token, last_value)
+        if dfa is not None:
+            self.stack[-1].dfa = dfa
+            self._add_token(token)
+            return
 
         if not self._error_recovery:
             return super().error_recovery(token)
@@ -5,6 +5,8 @@ from typing import Tuple
 from parso.python.errors import ErrorFinder, ErrorFinderConfig
 from parso.normalizer import Rule
 from parso.python.tree import Flow, Scope
+from parso.python.prefix import split_prefix
+from parso.utils import split_lines
 
 
 _IMPORT_TYPES = ('import_name', 'import_from')
@@ -24,6 +26,11 @@ _NEEDS_SPACE: Tuple[str, ...] = (
 _NEEDS_SPACE += _BITWISE_OPERATOR
 _IMPLICIT_INDENTATION_TYPES = ('dictorsetmaker', 'argument')
 _POSSIBLE_SLICE_PARENTS = ('subscript', 'subscriptlist', 'sliceop')
+# The codes of the checks that can be skipped if none of them is enabled.
+_INDENTATION_CODES = (101, 111, 121, 122, 123, 124, 126, 127, 128, 129, 135, 136, 291)
+_SPACING_CODES = (201, 202, 203, 211, 221, 223, 225, 227, 228, 229, 231, 251, 252, 261,
+                  275, 291)
+_LINE_LENGTH_CODES = (501,)
 
 
 class IndentationTypes:
@@ -152,6 +159,27 @@ def _is_magic_name(name):
 class PEP8Normalizer(ErrorFinder):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        if ' ' in self._config.indentation:
+            self._indentation_type = 'spaces'
+            self._wrong_indentation_char = '\t'
+        else:
+            self._indentation_type = 'tabs'
+            self._wrong_indentation_char = ' '
+
+        is_code_enabled = self._config.is_code_enabled
+        self._indentation_checked = any(map(is_code_enabled, _INDENTATION_CODES))
+        self._spacing_checked = any(map(is_code_enabled, _SPACING_CODES))
+        self._line_length_checked = any(map(is_code_enabled, _LINE_LENGTH_CODES))
+
+    def check(self, node, line_range=None, max_issues=None):
+        if max_issues is not None:
+            # PEP8 issues are not ordered like errors, so "the first issues"
+            # is not defined.
+            raise TypeError("max_issues is not supported by the PEP8 normalizer.")
+        super().check(node, line_range=line_range)
+
+    def initialize(self, node):
+        super().initialize(node)
         self._previous_part = None
         self._previous_leaf = None
         self._on_newline = True
@@ -164,13 +192,16 @@ class PEP8Normalizer(ErrorFinder):
         self._indentation_tos = self._last_indentation_tos = \
             IndentationNode(self._config, indentation='')
         self._in_suite_introducer = False
+        # The last visited leaf, if it's known to be the leaf before the next
+        # one. Used to get the start of prefixes without searching the tree.
+        self._prefix_start_leaf = None
 
-        if ' ' in self._config.indentation:
-            self._indentation_type = 'spaces'
-            self._wrong_indentation_char = '\t'
-        else:
-            self._indentation_type = 'tabs'
-            self._wrong_indentation_char = ' '
+    def _release_nodes(self):
+        super()._release_nodes()
+        self._previous_part = None
+        self._previous_leaf = None
+        self._prefix_start_leaf = None
+        self._indentation_tos = self._last_indentation_tos = None
 
     @contextmanager
     def visit_node(self, node):
@@ -341,9 +372,36 @@ class PEP8Normalizer(ErrorFinder):
 
         self._newline_count = 0
 
-    def visit_leaf(self, leaf):
-        super().visit_leaf(leaf)
-        for part in leaf._split_prefix():
+    def _visit_without_children(self, node):
+        code = super()._visit_without_children(node)
+        if code is not None:
+            # The leaves of the node are not visited.
+            self._prefix_start_leaf = None
+        return code
+
+    def _get_start_pos_of_prefix(self, leaf):
+        """
+        Works like ``leaf.get_start_pos_of_prefix()``, but uses the previously
+        visited leaf instead of searching the previous leaf in the tree.
+        """
+        previous_leaf = self._prefix_start_leaf
+        if previous_leaf is None or leaf.type == 'error_leaf':
+            return leaf.get_start_pos_of_prefix()
+
+        prefix = leaf.prefix
+        line, column = leaf.start_pos
+        if '\n' not in prefix and '\r' not in prefix:
+            return line, column - len(prefix)
+
+        end_pos = previous_leaf.end_pos
+        if end_pos[0] == line - len(split_lines(prefix)) + 1:
+            return end_pos
+        # Some statements in between were not visited.
+        return leaf.get_start_pos_of_prefix()
+
+    def _check_leaf(self, leaf):
+        super()._check_leaf(leaf)
+        for part in split_prefix(leaf, self._get_start_pos_of_prefix(leaf)):
             if part.type == 'spacing':
                 # This part is used for the part call after for.
                 break
@@ -372,8 +430,9 @@ class PEP8Normalizer(ErrorFinder):
             self._max_blank_lines = 0
 
         self._previous_leaf = leaf
-
-        return leaf.value
+        # Error leaves like indents are not used as the start of the prefix
+        # of the next leaf, see PythonLeaf.get_start_pos_of_prefix.
+        self._prefix_start_leaf = None if leaf.type == 'error_leaf' else leaf
 
     def _visit_part(self, part, spacing, leaf):
         value = part.value
@@ -432,7 +491,7 @@ class PEP8Normalizer(ErrorFinder):
                     and self._previous_part.type == 'newline':
                 self._indentation_tos = self._indentation_tos.parent
 
-            if not self._check_tabs_spaces(spacing):
+            if self._indentation_checked and not self._check_tabs_spaces(spacing):
                 should_be_indentation = node.indentation
                 if type_ == 'comment':
                     # Comments can be dedented. So we have to care for that.
@@ -518,10 +577,11 @@ class PEP8Normalizer(ErrorFinder):
                                             126,
                                             'Continuation line over-indented for hanging indent'
                                         )
-        else:
+        elif self._spacing_checked:
             self._check_spacing(part, spacing)
 
-        self._check_line_length(part, spacing)
+        if self._line_length_checked:
+            self._check_line_length(part, spacing)
         # -------------------------------
         # Finalizing. Updating the state.
         # -------------------------------
@@ -746,7 +806,9 @@ class PEP8NormalizerConfig(ErrorFinderConfig):
     Normalizing to PEP8. Not really implemented, yet.
     """
     def __init__(self, indentation=' ' * 4, hanging_indentation=None,
-                 max_characters=79, spaces_before_comment=2):
+                 max_characters=79, spaces_before_comment=2, *,
+                 include_codes=None, exclude_codes=()):
+        super().__init__(include_codes=include_codes, exclude_codes=exclude_codes)
         self.indentation = indentation
         if hanging_indentation is None:
             hanging_indentation = indentation
@@ -43,6 +43,8 @@ Parser Tree Classes
 """
 
 import re
+from bisect import bisect_left
+from heapq import merge
 from collections.abc import Mapping
 from typing import Tuple, Any
 
@@ -63,6 +65,16 @@ _GET_DEFINITION_TYPES = set([
     'import_from', 'param', 'del_stmt', 'namedexpr_test',
 ])
 _IMPORTS = set(['import_name', 'import_from'])
+# The values of these slots are not pickled.
+_TRANSIENT_MODULE_SLOTS = {
+    '_leaf_index': None,
+    '_leaf_lookups': 0,
+    '_type_index': None,
+    '_symbol_tables': None,
+    '_diff_changes': None,
+    '_error_cache': None,
+}
+_SCOPE_TYPES = ('classdef', 'funcdef', 'lambdef')
 
 
 class DocstringMixin:
@@ -362,6 +374,17 @@ class Scope(PythonBaseNode, DocstringMixin):
 
         return scan(self.children)
 
+    def get_symbol_table(self):
+        """
+        Returns the :class:`SymbolTable` of this scope. The symbol tables of
+        all scopes of a module are created in a single pass on the first call
+        and are reset by the diff parser.
+        """
+        root = self.get_root_node()
+        if root.type == 'file_input':
+            return root._get_symbol_tables()[self]
+        return _create_symbol_tables(self)[self]
+
     def get_suite(self):
         """
         Returns the part that is executed by the function.
@@ -384,12 +407,19 @@ class Module(Scope):
     Depending on the underlying parser this may be a full module or just a part
     of a module.
     """
-    __slots__ = ('_used_names',)
+    __slots__ = ('_used_names', '_leaf_index', '_leaf_lookups', '_type_index',
+                 '_symbol_tables', '_diff_changes', '_error_cache')
     type = 'file_input'
 
     def __init__(self, children):
         super().__init__(children)
         self._used_names = None
+        self._leaf_index = None
+        self._leaf_lookups = 0
+        self._type_index = None
+        self._symbol_tables = None
+        self._diff_changes = None
+        self._error_cache = None
 
     def _iter_future_import_names(self):
         """
@@ -415,22 +445,68 @@ class Module(Scope):
         if self._used_names is None:
             # Don't directly use self._used_names to eliminate a lookup.
             dct = {}
-
-            def recurse(node):
-                try:
-                    children = node.children
-                except AttributeError:
-                    if node.type == 'name':
-                        arr = dct.setdefault(node.value, [])
-                        arr.append(node)
-                else:
-                    for child in children:
-                        recurse(child)
-
-            recurse(self)
+            for leaf in self.iter_leaves():
+                if leaf.type == 'name':
+                    dct.setdefault(leaf.value, []).append(leaf)
             self._used_names = UsedNamesMapping(dct)
         return self._used_names
 
+    def _get_symbol_tables(self):
+        if self._symbol_tables is None:
+            self._symbol_tables = _create_symbol_tables(self)
+        return self._symbol_tables
+
+    def get_nodes_by_type(self, *node_types):
+        """
+        Returns a list of all the nodes and leaves of the given types in this
+        module in the order they appear in the code, e.g.
+        ``module.get_nodes_by_type('import_name', 'import_from')``.
+
+        An index of all types is created on the first call, further calls are
+        therefore cheap. The diff parser resets the index.
+        """
+        if self._type_index is None:
+            self._type_index = _TypeIndex(self)
+        return self._type_index.get_nodes(node_types)
+
+    def get_leaf_for_position(self, position, include_prefixes=False):
+        """
+        Works like :py:meth:`parso.tree.BaseNode.get_leaf_for_position`. After
+        a lot of lookups without a change of the module (e.g. for every cursor
+        movement in an editor), an index of all leaves is created, which makes
+        further lookups a lot cheaper. The diff parser resets the index.
+        """
+        if self._leaf_index is None:
+            # Creating the index costs about as much as a lookup in the tree
+            # for every ten lines, so it's only created once the lookups
+            # since the last change have cost that much.
+            self._leaf_lookups += 1
+            if self._leaf_lookups * 10 < self.end_pos[0]:
+                return super().get_leaf_for_position(position, include_prefixes)
+            self._leaf_index = _LeafIndex(self)
+        return self._leaf_index.get_leaf_for_position(position, include_prefixes)
+
+    def get_diff_changes(self):
+        """
+        Returns a :py:class:`parso.python.diff.DiffChanges` object with the
+        nodes that were reused, added and removed by the last update of the
+        diff parser. Returns None if the module was never changed by it or if
+        the changes were not recorded (see ``record_diff_changes`` of
+        :py:meth:`parso.Grammar.parse`).
+        """
+        return self._diff_changes
+
+    def __getstate__(self):
+        # The indexes, the error cache and the changes of the diff parser are
+        # only needed while the module is in RAM and can be big.
+        state = {'parent': self.parent, 'children': self.children}
+        for name in self.__slots__:
+            try:
+                state[name] = _TRANSIENT_MODULE_SLOTS[name]
+            except KeyError:
+                state[name] = getattr(self, name)
+        return None, state
+
 
 class Decorator(PythonBaseNode):
     type = 'decorator'
@@ -582,23 +658,13 @@ class Function(ClassOrFunc):
         """
         Returns a generator of `yield_expr`.
         """
-        def scan(children):
-            for element in children:
-                if element.type in ('classdef', 'funcdef', 'lambdef'):
-                    continue
-
-                try:
-                    nested_children = element.children
-                except AttributeError:
-                    if element.value == 'yield':
-                        if element.parent.type == 'yield_expr':
-                            yield element.parent
-                        else:
-                            yield element
+        for element in self.iter_descendants(
+                'keyword', skip_types=('classdef', 'funcdef', 'lambdef')):
+            if element.value == 'yield':
+                if element.parent.type == 'yield_expr':
+                    yield element.parent
                 else:
-                    yield from scan(nested_children)
-
-        return scan(self.children)
+                    yield element
 
     def iter_return_stmts(self):
         """
@@ -1231,6 +1297,230 @@ class SyncCompFor(PythonBaseNode):
 CompFor = SyncCompFor
 
 
+class _LeafIndex:
+    """
+    All leaves of a module in order, together with their end positions and a
+    mapping of lines to the first leaf that ends on that line or after it.
+    """
+    def __init__(self, module):
+        self._leaves = leaves = list(module.iter_leaves())
+        self._end_positions = end_positions = [leaf.end_pos for leaf in leaves]
+        # _line_offsets[line] is the index of the first leaf that ends on
+        # `line` or later.
+        last_line = end_positions[-1][0]
+        self._line_offsets = line_offsets = []
+        line = 0
+        for i, (end_line, _) in enumerate(end_positions):
+            while line <= end_line:
+                line_offsets.append(i)
+                line += 1
+        line_offsets.append(len(leaves))
+        assert len(line_offsets) == last_line + 2
+
+    def get_leaf_for_position(self, position, include_prefixes):
+        if not ((1, 0) <= position <= self._end_positions[-1]):
+            raise ValueError('Please provide a position that exists within this node.')
+
+        line = position[0]
+        index = bisect_left(
+            self._end_positions,
+            position,
+            self._line_offsets[line],
+            self._line_offsets[line + 1],
+        )
+        leaf = self._leaves[index]
+        if not include_prefixes and position < leaf.start_pos:
+            # We're on a prefix.
+            return None
+        return leaf
+
+
+class SymbolTable:
+    """
+    Contains the names that are defined in a scope (a module, class, function
+    or lambda) and the names that are declared ``global`` or ``nonlocal``
+    there. Use :py:meth:`Scope.get_symbol_table` to get one.
+
+    Names defined in comprehensions are not part of the table of the
+    surrounding scope, because comprehensions have their own scope in Python.
+    Defaults, annotations and base classes are evaluated in the surrounding
+    scope, so names defined there (e.g. with ``:=``) belong to its table.
+    """
+    def __init__(self, scope, parent=None):
+        self.scope = scope
+        """
+        The :class:`Scope` this table belongs to.
+        """
+        self.parent = parent
+        """
+        The table of the surrounding scope or ``None`` for the outermost scope.
+        """
+        self.children = []
+        """
+        The tables of the scopes directly within this scope.
+        """
+        self._definitions = {}
+        self._global_names = {}
+        self._nonlocal_names = {}
+
+    def _add_name(self, name):
+        parent = name.parent
+        if parent.type == 'trailer':
+            # Attributes like `self.x = 1` don't define a name in the scope.
+            return
+        if parent.type == 'global_stmt':
+            self._global_names.setdefault(name.value, []).append(name)
+        elif parent.type == 'nonlocal_stmt':
+            self._nonlocal_names.setdefault(name.value, []).append(name)
+        else:
+            definition = name.get_definition()
+            if definition is None or definition.type == 'sync_comp_for':
+                return
+
+            table = self
+            if definition.type in ('funcdef', 'classdef'):
+                # The name of a function or class belongs to the surrounding
+                # scope.
+                table = self.parent
+                if table is None:
+                    return
+            table._definitions.setdefault(name.value, []).append(name)
+
+    def get_defined_names(self):
+        """
+        Returns a list of the strings of all names defined in this scope.
+        """
+        return list(self._definitions)
+
+    def get_definitions(self, name):
+        """
+        Returns the :class:`Name` leaves that define the name (a string) in
+        this scope.
+        """
+        return list(self._definitions.get(name, ()))
+
+    def get_global_names(self):
+        """
+        Returns the :class:`Name` leaves of all ``global`` declarations.
+        """
+        return [n for names in self._global_names.values() for n in names]
+
+    def get_nonlocal_names(self):
+        """
+        Returns the :class:`Name` leaves of all ``nonlocal`` declarations.
+        """
+        return [n for names in self._nonlocal_names.values() for n in names]
+
+    def is_global(self, name):
+        """
+        Returns whether the name (a string) is declared ``global`` in this
+        scope.
+        """
+        return name in self._global_names
+
+    def is_nonlocal(self, name):
+        """
+        Returns whether the name (a string) is declared ``nonlocal`` in this
+        scope.
+        """
+        return name in self._nonlocal_names
+
+    def __repr__(self):
+        return '<%s: %s>' % (type(self).__name__, self.scope)
+
+
+def _split_scope_children(scope):
+    """
+    Returns the children of a scope that are evaluated in the surrounding
+    scope (defaults, annotations and base classes) and the ones that belong
+    to the scope itself.
+    """
+    children = scope.children
+    if scope.type == 'classdef':
+        if children[2] == '(' and children[3] != ')':
+            return [children[3]], [children[1], children[-1]]
+        return [], [children[1], children[-1]]
+
+    outer = []
+    inner = []
+    for param in scope.get_params():
+        inner.append(param.name)
+        for node in (param.annotation, param.default):
+            if node is not None:
+                outer.append(node)
+    if scope.type == 'lambdef':
+        inner.append(children[-1])
+    else:
+        annotation = scope.annotation
+        if annotation is not None:
+            outer.append(annotation)
+        inner += [children[1], children[-1]]
+    return outer, inner
+
+
+def _create_symbol_tables(scope):
+    """
+    Returns a dict of all scopes within the given scope (including itself) to
+    their symbol tables.
+    """
+    table = SymbolTable(scope)
+    tables = {scope: table}
+    # Contains the iterators of the parent nodes together with the table that
+    # was active or a scope, whose table needs to be created before its
+    # children are visited.
+    stack = []
+    iterator = iter(scope.children)
+    while True:
+        for node in iterator:
+            if isinstance(node, Leaf):
+                if node.type == 'name':
+                    table._add_name(node)
+                continue
+
+            stack.append((iterator, table))
+            if node.type in _SCOPE_TYPES:
+                # Defaults, annotations and base classes are evaluated in the
+                # surrounding scope before the scope is created.
+                outer, inner = _split_scope_children(node)
+                stack.append((iter(inner), node))
+                iterator = iter(outer)
+            else:
+                iterator = iter(node.children)
+            break
+        else:
+            if not stack:
+                return tables
+            iterator, table_or_scope = stack.pop()
+            if isinstance(table_or_scope, SymbolTable):
+                table = table_or_scope
+            else:
+                new_table = SymbolTable(table_or_scope, parent=table)
+                table.children.append(new_table)
+                table = tables[table_or_scope] = new_table
+
+
+class _TypeIndex:
+    """
+    All nodes and leaves of a module in order and a mapping of types to their
+    indexes in that list.
+    """
+    def __init__(self, module):
+        self._nodes = nodes = list(module.walk())
+        self._type_to_indexes = dct = {}
+        for i, node in enumerate(nodes):
+            dct.setdefault(node.type, []).append(i)
+
+    def get_nodes(self, node_types):
+        nodes = self._nodes
+        dct = self._type_to_indexes
+        if len(node_types) == 1:
+            indexes = dct.get(node_types[0], ())
+        else:
+            # Merging the indexes keeps the order of the code.
+            indexes = merge(*[dct.get(t, ()) for t in set(node_types)])
+        return [nodes[i] for i in indexes]
+
+
 class UsedNamesMapping(Mapping):
     """
     This class exists for the sole purpose of creating an immutable dict.
@@ -1,5 +1,5 @@
 from abc import abstractmethod, abstractproperty
-from typing import List, Optional, Tuple, Union
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
 
 from parso.utils import split_lines
 
@@ -391,11 +391,33 @@ class BaseNode(NodeOrLeaf):
         return self.children[-1].end_pos
 
     def _get_code_for_children(self, children, include_prefix):
-        if include_prefix:
-            return "".join(c.get_code() for c in children)
-        else:
-            first = children[0].get_code(include_prefix=False)
-            return first + "".join(c.get_code() for c in children[1:])
+        # This is not recursive on purpose. Deeply nested code would otherwise
+        # hit the recursion limit and calling get_code on every node is slow.
+        parts = []
+        append = parts.append
+        stack = []
+        iterator = iter(children)
+        if not include_prefix:
+            node = next(iterator)
+            while not isinstance(node, Leaf):
+                stack.append(iterator)
+                iterator = iter(node.children)
+                node = next(iterator)
+            append(node.value)
+
+        while True:
+            for node in iterator:
+                if isinstance(node, Leaf):
+                    append(node.prefix)
+                    append(node.value)
+                else:
+                    stack.append(iterator)
+                    iterator = iter(node.children)
+                    break
+            else:
+                if not stack:
+                    return ''.join(parts)
+                iterator = stack.pop()
 
     def get_code(self, include_prefix=True):
         return self._get_code_for_children(self.children, include_prefix)
@@ -409,28 +431,30 @@ class BaseNode(NodeOrLeaf):
             on whitespace or comments before a leaf
         :return: :py:class:`parso.tree.Leaf` at ``position``, or ``None``
         """
-        def binary_search(lower, upper):
-            if lower == upper:
-                element = self.children[lower]
-                if not include_prefixes and position < element.start_pos:
-                    # We're on a prefix.
-                    return None
-                # In case we have prefixes, a leaf always matches
-                try:
-                    return element.get_leaf_for_position(position, include_prefixes)
-                except AttributeError:
-                    return element
-
-            index = int((lower + upper) / 2)
-            element = self.children[index]
-            if position <= element.end_pos:
-                return binary_search(lower, index)
-            else:
-                return binary_search(index + 1, upper)
-
         if not ((1, 0) <= position <= self.children[-1].end_pos):
             raise ValueError('Please provide a position that exists within this node.')
-        return binary_search(0, len(self.children) - 1)
+
+        node = self
+        while True:
+            # Binary search for the first child that ends after the position.
+            children = node.children
+            lower = 0
+            upper = len(children) - 1
+            while lower < upper:
+                index = (lower + upper) // 2
+                if position <= children[index].end_pos:
+                    upper = index
+                else:
+                    lower = index + 1
+
+            element = children[lower]
+            if not include_prefixes and position < element.start_pos:
+                # We're on a prefix.
+                return None
+            # In case we have prefixes, a leaf always matches
+            if isinstance(element, Leaf):
+                return element
+            node = element
 
     def get_first_leaf(self):
         return self.children[0].get_first_leaf()
@@ -438,6 +462,80 @@ class BaseNode(NodeOrLeaf):
     def get_last_leaf(self):
         return self.children[-1].get_last_leaf()
 
+    def walk(self) -> 'Iterator[NodeOrLeaf]':
+        """
+        Returns a generator of this node and all the nodes and leaves below it
+        in the order they appear in the code (pre-order). The tree is traversed
+        without recursion, so this also works for very deeply nested code.
+        """
+        yield self
+        stack = []
+        iterator = iter(self.children)
+        while True:
+            for node in iterator:
+                yield node
+                if not isinstance(node, Leaf):
+                    stack.append(iterator)
+                    iterator = iter(node.children)
+                    break
+            else:
+                if not stack:
+                    return
+                iterator = stack.pop()
+
+    def iter_leaves(self) -> 'Iterator[Leaf]':
+        """
+        Returns a generator of all the leaves of this node in the order they
+        appear in the code.
+        """
+        stack = []
+        iterator = iter(self.children)
+        while True:
+            for node in iterator:
+                if isinstance(node, Leaf):
+                    yield node
+                else:
+                    stack.append(iterator)
+                    iterator = iter(node.children)
+                    break
+            else:
+                if not stack:
+                    return
+                iterator = stack.pop()
+
+    def iter_descendants(self, *node_types: str,
+                         skip_types: Iterable[str] = ()) -> 'Iterator[NodeOrLeaf]':
+        """
+        Returns a generator of all the nodes and leaves below this node that
+        match ``node_types`` in the order they appear in the code.
+
+        >>> import parso
+        >>> module = parso.parse('def f(): return [x for x in y]\\nz = lambda: x')
+        >>> [n.value for n in module.iter_descendants('name', skip_types=['lambdef'])]
+        ['f', 'x', 'x', 'y', 'z']
+
+        :param node_types: type names that are searched for.
+        :param skip_types: The children of nodes with these types are not
+            searched. The nodes themselves are still returned if they match
+            ``node_types``.
+        """
+        skip_types = frozenset(skip_types)
+        stack = []
+        iterator = iter(self.children)
+        while True:
+            for node in iterator:
+                type_ = node.type
+                if type_ in node_types:
+                    yield node
+                if not isinstance(node, Leaf) and type_ not in skip_types:
+                    stack.append(iterator)
+                    iterator = iter(node.children)
+                    break
+            else:
+                if not stack:
+                    return
+                iterator = stack.pop()
+
     def __repr__(self):
         code = self.get_code().replace('\n', ' ').replace('\r', ' ').strip()
         return "<%s: %s@%s,%s>" % \
@@ -1,50 +1,147 @@
 #!/usr/bin/env python
 """
-Profile a piece of Python code with ``cProfile`` that uses the diff parser.
+Benchmarks and profiles the diff parser by replaying realistic edit sequences
+(typing, pasting, deleting blocks and changing indentation) against Python
+files. The latency of every edit is compared with a full parse of the same
+code.
 
 Usage:
-  profile.py <file> [-d] [-s <sort>]
-  profile.py -h | --help
+  diff_parser_profile.py [-n=<nr>] [-r=<nr>] [--seed=<nr>] [-p] [-s <sort>] [<file>...]
+  diff_parser_profile.py -h | --help
 
 Options:
-  -h --help     Show this screen.
-  -d --debug    Enable Jedi internal debugging.
-  -s <sort>     Sort the profile results, e.g. cumtime, name [default: time].
+  -h --help             Show this screen.
+  -n=<nr>               Number of edit sequences per kind of edit [default: 10].
+  -r, --repeat=<nr>     Repeat the code of the file to get bigger files [default: 1].
+  --seed=<nr>           The seed for the random edits [default: 0].
+  -p --profile          Profile the diff parser with cProfile instead.
+  -s <sort>             Sort the profile results, e.g. cumtime, name [default: time].
 """
 
 import cProfile
+import os
+import random
+import time
 
 from docopt import docopt
-from jedi.parser.python import load_grammar  # type: ignore[import-not-found]
-from jedi.parser.diff import DiffParser  # type: ignore[import-not-found]
-from jedi.parser.python import ParserWithRecovery  # type: ignore[import-not-found]
-from jedi.common import splitlines  # type: ignore[import-not-found]
-import jedi  # type: ignore[import-not-found]
 
+import parso
+from parso.utils import split_lines
 
-def run(parser, lines):
-    diff_parser = DiffParser(parser)
-    diff_parser.update(lines)
-    # Make sure used_names is loaded
-    parser.module.used_names
+_DEFAULT_FILES = [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'parso', 'python', name)
+    for name in ('tree.py', 'errors.py', 'diff.py')
+]
+
+
+def _typing(lines):
+    """Types a new statement at the start of a random line."""
+    index = random.randrange(len(lines))
+    indentation = lines[index][:len(lines[index]) - len(lines[index].lstrip())]
+    statement = indentation + 'result = some_function(foo, bar=[1, 2])\n'
+    for i in range(len(indentation) + 1, len(statement) + 1):
+        yield lines[:index] + [statement[:i] + lines[index]] + lines[index + 1:]
+
+
+def _pasting(lines):
+    """Pastes a block of lines from somewhere else in the file."""
+    start = random.randrange(len(lines))
+    block = lines[start:start + random.randint(5, 40)]
+    index = random.randrange(len(lines))
+    yield lines[:index] + block + lines[index:]
+
+
+def _deleting(lines):
+    """Deletes a block of lines and adds it again (like an undo)."""
+    start = random.randrange(len(lines))
+    yield lines[:start] + lines[start + random.randint(5, 40):]
+    yield lines
+
+
+def _indenting(lines):
+    """Indents a block of lines and dedents it again."""
+    start = random.randrange(len(lines))
+    end = start + random.randint(2, 20)
+    yield lines[:start] + ['    ' + line for line in lines[start:end]] + lines[end:]
+    yield lines
+
+
+_EDITS = [_typing, _pasting, _deleting, _indenting]
+
+
+def _replay(grammar, lines, edit_function, count):
+    """
+    Returns a list of ``(diff_parse_time, full_parse_time)`` for every edit.
+    """
+    results = []
+    for i in range(count):
+        grammar.parse(''.join(lines), diff_cache=True, document_key='benchmark')
+        for new_lines in edit_function(lines):
+            code = ''.join(new_lines)
+            start = time.perf_counter()
+            grammar.parse(code, diff_cache=True, document_key='benchmark')
+            diff_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            grammar.parse(code)
+            results.append((diff_time, time.perf_counter() - start))
+        grammar.close_document('benchmark')
+    return results
+
+
+def _percentile(sorted_values, percent):
+    return sorted_values[min(len(sorted_values) - 1, len(sorted_values) * percent // 100)]
+
+
+def _print_results(name, results):
+    line = '%-10s %5s' % (name, len(results))
+    for times in zip(*results):
+        times = sorted(times)
+        line += ' |' + ''.join(
+            ' %7.1f' % (_percentile(times, p) * 1000) for p in (50, 90, 99)
+        )
+    print(line)
+
+
+def _profile(grammar, files, count):
+    profile = cProfile.Profile()
+    for lines in files:
+        for edit_function in _EDITS:
+            for i in range(count):
+                grammar.parse(''.join(lines), diff_cache=True, document_key='profile')
+                for new_lines in edit_function(lines):
+                    code = ''.join(new_lines)
+                    # Only profile the diff parser, not the initial parse.
+                    profile.enable()
+                    grammar.parse(code, diff_cache=True, document_key='profile')
+                    profile.disable()
+                grammar.close_document('profile')
+    return profile
 
 
 def main(args):
-    if args['--debug']:
-        jedi.set_debug_function(notices=True)
+    random.seed(int(args['--seed']))
+    count = int(args['-n'])
+    files = []
+    for path in args['<file>'] or _DEFAULT_FILES:
+        with open(path) as f:
+            files.append(split_lines(f.read() * int(args['--repeat']), keepends=True))
 
-    with open(args['<file>']) as f:
-        code = f.read()
-    grammar = load_grammar()
-    parser = ParserWithRecovery(grammar, code)
-    # Make sure used_names is loaded
-    parser.module.used_names
+    grammar = parso.load_grammar()
+    if args['--profile']:
+        _profile(grammar, files, count).print_stats(sort=args['-s'])
+        return
 
-    code = code + '\na\n'  # Add something so the diff parser needs to run.
-    lines = splitlines(code, keepends=True)
-    cProfile.runctx('run(parser, lines)', globals(), locals(), sort=args['-s'])
+    print('Lines: %s' % ', '.join(str(len(lines)) for lines in files))
+    print('%-10s %5s | %23s | %23s' % ('', '', 'diff parser (ms)', 'full parse (ms)'))
+    percentiles = ' %7s %7s %7s' % ('p50', 'p90', 'p99')
+    print('%-10s %5s |%s |%s' % ('edit', 'count', percentiles, percentiles))
+    for edit_function in _EDITS:
+        results = []
+        for lines in files:
+            results += _replay(grammar, lines, edit_function, count)
+        _print_results(edit_function.__name__.strip('_'), results)
 
 
 if __name__ == '__main__':
-    args = docopt(__doc__)
-    main(args)
+    main(docopt(__doc__))
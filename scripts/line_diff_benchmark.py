@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""
+Compares the line diff of the diff parser with ``difflib.SequenceMatcher``,
+which was used before. The lines of the given file are repeated until the
+file has ``--lines`` lines and are then changed in a few typical ways.
+"""
+
+import argparse
+import difflib
+import os
+import random
+import timeit
+
+from parso.utils import split_lines
+from parso.python.diff import _get_opcodes
+
+
+def _difflib_opcodes(old_lines, new_lines):
+    return difflib.SequenceMatcher(None, old_lines, new_lines).get_opcodes()
+
+
+def _changes(lines):
+    new = list(lines)
+    new[len(new) // 2] = 'x = 1\n'
+    yield 'one changed line', new
+
+    new = list(lines)
+    new[len(new) // 3:len(new) // 3] = ['\n', '    pass\n', ')\n'] * 50
+    yield 'inserted block', new
+
+    for count in (10, 100, 1000):
+        new = list(lines)
+        for i in random.sample(range(len(new)), count):
+            new[i] = 'changed_%s = 1\n' % i
+        yield '%s scattered changes' % count, new
+
+    yield 'reindented', ['    ' + line for line in lines]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('file', nargs='?', default=os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '..', 'parso', 'python', 'errors.py'))
+    parser.add_argument('--lines', type=int, default=20000)
+    parser.add_argument('-n', type=int, default=5, help='Number of runs')
+    args = parser.parse_args()
+
+    with open(args.file) as f:
+        lines = split_lines(f.read(), keepends=True)
+    lines = (lines * (args.lines // len(lines) + 1))[:args.lines]
+    random.seed(0)
+
+    print('%-22s %10s %10s' % ('', 'difflib', 'parso'))
+    for name, new_lines in _changes(lines):
+        times = [
+            min(timeit.repeat(lambda: func(lines, new_lines), number=1, repeat=args.n))
+            for func in (_difflib_opcodes, _get_opcodes)
+        ]
+        print('%-22s %9.2fms %9.2fms' % (name, times[0] * 1000, times[1] * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+Benchmarks the error finder and the PEP8 normalizer on big modules. The code
+of every file is repeated to get big modules and the best time of a few runs
+is printed.
+
+Usage:
+  pep8_benchmark.py [-n=<nr>] [-r=<nr>] [-p] [-s <sort>] [<file>...]
+  pep8_benchmark.py -h | --help
+
+Options:
+  -h --help             Show this screen.
+  -n=<nr>               Number of runs [default: 3].
+  -r, --repeat=<nr>     Repeat the code of the file to get bigger files [default: 10].
+  -p --profile          Profile the PEP8 normalizer with cProfile instead.
+  -s <sort>             Sort the profile results, e.g. cumtime, name [default: time].
+"""
+
+import cProfile
+import os
+import time
+
+from docopt import docopt
+
+import parso
+from parso.python.pep8 import PEP8NormalizerConfig
+
+_DEFAULT_FILES = [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'parso', 'python', name)
+    for name in ('tree.py', 'errors.py', 'diff.py')
+]
+
+
+def _best_time(function, count):
+    times = []
+    for i in range(count):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(args):
+    count = int(args['-n'])
+    grammar = parso.load_grammar()
+    modules = []
+    for path in args['<file>'] or _DEFAULT_FILES:
+        with open(path) as f:
+            modules.append((os.path.basename(path),
+                            grammar.parse(f.read() * int(args['--repeat']))))
+
+    if args['--profile']:
+        profile = cProfile.Profile()
+        for name, module in modules:
+            profile.runcall(grammar._get_normalizer_issues, module, PEP8NormalizerConfig())
+        profile.print_stats(sort=args['-s'])
+        return
+
+    print('%-12s %7s %12s %12s' % ('file', 'lines', 'errors (ms)', 'pep8 (ms)'))
+    for name, module in modules:
+        errors_time = _best_time(lambda: grammar.iter_errors(module), count)
+        pep8_time = _best_time(
+            lambda: grammar._get_normalizer_issues(module, PEP8NormalizerConfig()),
+            count
+        )
+        print('%-12s %7s %12.1f %12.1f' % (
+            name, module.end_pos[0], errors_time * 1000, pep8_time * 1000))
+
+
+if __name__ == '__main__':
+    main(docopt(__doc__))
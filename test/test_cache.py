@@ -191,3 +191,55 @@ def test_permission_error(monkeypatch):
         assert was_called
     finally:
         parser_cache.clear()
+
+
+@skip_pypy
+def test_diff_cache_from_file_system(tmpdir, isolated_parso_cache):
+    path = Path(str(tmpdir), 'diff_cache.py')
+    path.write_text('def f():\n    pass\n\nx = 1\n')
+    grammar = load_grammar()
+    parser_cache.clear()
+    module = grammar.parse(path=path, cache=True, diff_cache=True)
+    old_function = module.children[0]
+
+    # Simulate a restart and a change of the file.
+    parser_cache.clear()
+    path.write_text('def f():\n    pass\n\nx = 2\n')
+    os.utime(path, (time.time() + 10,) * 2)
+    module = grammar.parse(path=path, cache=True, diff_cache=True, record_diff_changes=True)
+    assert module.get_code() == path.read_text()
+    assert module.get_diff_changes().reused[0][0].get_code() == old_function.get_code()
+
+    # Without cache there's no access to the file system.
+    parser_cache.clear()
+    module = grammar.parse(path=path, diff_cache=True)
+    assert module.get_diff_changes() is None
+
+    # Edits are never applied to the pickled module, which might be outdated.
+    grammar.parse('x = 1\n', path=path, cache=True, diff_cache=True)
+    grammar.parse('yy = 1\n', path=path, diff_cache=True)
+    parser_cache.clear()
+    with pytest.raises(ValueError):
+        grammar.parse(path=path, edits=[((1, 0), (1, 2), 'zz')], cache=True, diff_cache=True)
+
+
+def test_diff_cache_document_key():
+    grammar = load_grammar()
+    module = grammar.parse('x = 1\n', diff_cache=True, document_key='cell-1')
+    other = grammar.parse('y = 1\n', diff_cache=True, document_key='cell-2')
+    try:
+        assert other is not module
+        assert grammar.parse('x = 2\n', diff_cache=True, document_key='cell-1') is module
+        assert module.get_code() == 'x = 2\n'
+        edited = grammar.parse(diff_cache=True, document_key='cell-1',
+                               edits=[((1, 0), (1, 1), 'z')])
+        assert edited is module
+        assert module.get_code() == 'z = 2\n'
+    finally:
+        grammar.close_document('cell-1')
+        grammar.close_document('cell-2')
+    assert grammar.parse('x = 1\n', diff_cache=True, document_key='cell-1') is not module
+    grammar.close_document('cell-1')
+
+    with pytest.raises(TypeError):
+        grammar.parse('x', document_key='cell-1')
@@ -1,13 +1,19 @@
 # -*- coding: utf-8 -*-
+import pickle
 from textwrap import dedent
+from pathlib import Path
+import difflib
 import logging
 
 import pytest
 
 from parso.utils import split_lines
+from parso.tree import BaseNode
 from parso import cache
 from parso import load_grammar
-from parso.python.diff import DiffParser, _assert_valid_graph, _assert_nodes_are_equal
+from parso.python.diff import DiffParser, _assert_valid_graph, _assert_nodes_are_equal, \
+    _assert_used_names_are_equal, _apply_edits, _get_opcodes
+from parso.python import diff
 from parso import parse
 
 ANY = object()
@@ -38,6 +44,21 @@ def _check_error_leaves_nodes(node):
     return None
 
 
+def _assert_valid_diff_changes(module):
+    changes = module.get_diff_changes()
+    nodes = set(map(id, module.walk()))
+    assert all(id(node) not in nodes for node in changes.removed)
+
+    covered = set()
+    for node in changes.added + [node for node, line_offset in changes.reused]:
+        assert id(node) in nodes
+        if isinstance(node, BaseNode):
+            covered |= set(map(id, node.walk()))
+        else:
+            covered.add(id(node))
+    assert nodes - covered == {id(module), id(module.children[-1])}
+
+
 class Differ:
     grammar = load_grammar()
 
@@ -52,6 +73,8 @@ class Differ:
         self.module = parse(code, diff_cache=True, cache=True)
         assert code == self.module.get_code()
         _assert_valid_graph(self.module)
+        # Make sure the used names are updated by the diff parser.
+        self.module.get_used_names()
         return self.module
 
     def parse(self, code, copies=0, parsers=0, expect_error_leaves=False):
@@ -61,6 +84,7 @@ class Differ:
             self.grammar._pgen_grammar,
             self.grammar._tokenizer,
             self.module,
+            record_changes=True,
         )
         new_module = diff_parser.update(self.lines, lines)
         self.lines = lines
@@ -70,6 +94,13 @@ class Differ:
 
         without_diff_parser_module = parse(code)
         _assert_nodes_are_equal(new_module, without_diff_parser_module)
+        assert new_module._used_names is not None
+        _assert_used_names_are_equal(
+            new_module.get_used_names(),
+            without_diff_parser_module.get_used_names()
+        )
+
+        _assert_valid_diff_changes(new_module)
 
         error_node = _check_error_leaves_nodes(new_module)
         assert expect_error_leaves == (error_node is not None), error_node
@@ -1744,3 +1775,201 @@ def test_one_line_property_error_recovery(differ):
 
     differ.initialize(code1)
     differ.parse(code2, parsers=2, copies=1, expect_error_leaves=True)
+
+
+def test_leaf_index_reset(differ):
+    module = differ.initialize('a = 1\n')
+    assert module.get_leaf_for_position((1, 4)).value == '1'
+    assert module._leaf_index is not None
+    differ.parse('foo\na = 1\n', copies=1, parsers=1)
+    assert module._leaf_index is None and module._leaf_lookups == 0
+    assert module.get_leaf_for_position((1, 0)).value == 'foo'
+    assert module.get_leaf_for_position((2, 4)).value == '1'
+
+
+def test_type_index_reset(differ):
+    module = differ.initialize('import os\n')
+    assert len(module.get_nodes_by_type('import_name')) == 1
+    differ.parse('import os\nimport sys\n', copies=1, parsers=1)
+    assert len(module.get_nodes_by_type('import_name')) == 2
+
+
+def test_symbol_tables_reset(differ):
+    module = differ.initialize('a = 1\n')
+    assert module.get_symbol_table().get_defined_names() == ['a']
+    differ.parse('a = 1\nb = 2\n', copies=1, parsers=1)
+    assert module.get_symbol_table().get_defined_names() == ['a', 'b']
+
+
+@pytest.mark.parametrize(('code', 'edits', 'expected'), [
+    ('a\nb\n', [((1, 0), (1, 1), 'x')], 'x\nb\n'),
+    ('a\nb\n', [((1, 1), (2, 0), '')], 'ab\n'),
+    ('a\nb\n', [((2, 1), (2, 1), '\nc\nd')], 'a\nb\nc\nd\n'),
+    ('a\r\nb\n', [((1, 1), (1, 1), '\r')], 'a\r\r\nb\n'),
+    ('a\r', [((2, 0), (2, 0), '\nb')], 'a\r\nb'),
+    ('a\nb', [((1, 0), (1, 0), 'x'), ((2, 1), (2, 1), 'y')], 'xa\nby'),
+])
+def test_apply_edits(code, edits, expected):
+    lines = split_lines(code, keepends=True)
+    new_lines, opcodes = _apply_edits(lines, edits)
+    assert new_lines == split_lines(expected, keepends=True)
+    for operation, i1, i2, j1, j2 in opcodes:
+        if operation == 'equal':
+            assert lines[i1:i2] == new_lines[j1:j2]
+
+
+@pytest.mark.parametrize('edit', [((0, 0), (1, 0), ''), ((1, 2), (1, 2), ''),
+                                  ((2, 0), (1, 0), ''), ((3, 0), (3, 0), '')])
+def test_apply_edits_invalid(edit):
+    with pytest.raises(ValueError):
+        _apply_edits(['a\n', ''], [edit])
+
+
+def test_parse_with_edits():
+    grammar = load_grammar()
+    path = Path('edits_test.py')
+    module = grammar.parse('def f():\n    pass\n\nx = 1\n', path=path, diff_cache=True)
+    try:
+        new = grammar.parse(path=path, diff_cache=True,
+                            edits=[((4, 4), (4, 5), '2'), ((2, 4), (2, 8), 'return')])
+        code = 'def f():\n    return\n\nx = 2\n'
+        assert new is module
+        assert new.get_code() == code
+        _assert_nodes_are_equal(new, parse(code))
+        assert cache.parser_cache[grammar._hashed][path].lines == split_lines(code, True)
+    finally:
+        del cache.parser_cache[grammar._hashed][path]
+
+    with pytest.raises(ValueError):
+        grammar.parse(path=path, diff_cache=True, edits=[])
+    with pytest.raises(TypeError):
+        grammar.parse('', path=path, diff_cache=True, edits=[])
+    with pytest.raises(TypeError):
+        grammar.parse(path=path, edits=[])
+
+
+@pytest.mark.parametrize(('old', 'new'), [
+    ('', ''),
+    ('abc', 'abc'),
+    ('', 'abc'),
+    ('abc', ''),
+    ('abc', 'axc'),
+    ('abcd', 'acbd'),
+    ('ab\n\n\nc', '\n\n\nab\nc'),
+    ('ac', 'caaca'),
+    ('abcabba', 'cbabac'),
+])
+def test_get_opcodes(old, new):
+    old = list(old)
+    new = list(new)
+    opcodes = _get_opcodes(old, new)
+    matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+    # Myers' algorithm finds the longest common subsequence, difflib not
+    # always.
+    assert sum(i2 - i1 for operation, i1, i2, j1, j2 in opcodes if operation == 'equal') \
+        >= sum(size for i, j, size in matcher.get_matching_blocks())
+
+    i = j = 0
+    for operation, i1, i2, j1, j2 in opcodes:
+        assert (i1, j1) == (i, j)
+        if operation == 'equal':
+            assert old[i1:i2] == new[j1:j2]
+        i, j = i2, j2
+    assert (i, j) == (len(old), len(new))
+
+
+def test_get_opcodes_big_distance(monkeypatch):
+    monkeypatch.setattr(diff, '_MAX_BISECT_DISTANCE', 2)
+    old = ['a\n', 'b\n', 'c\n', 'pass\n'] * 10
+    new = ['pass\n', 'b\n', 'x\n'] * 10
+    matcher = difflib.SequenceMatcher(None, old, new)
+    assert _get_opcodes(old, new) == matcher.get_opcodes()
+
+
+def test_diff_changes(differ):
+    code1 = dedent('''\
+        def f():
+            return 1
+
+        def g():
+            x = 1
+            return x
+
+        def h():
+            return 2
+        ''')
+    code2 = dedent('''\
+        import os
+
+        def f():
+            return 1
+
+        def g():
+            x = 1
+            return y
+
+        def h():
+            return 2
+        ''')
+    module = differ.initialize(code1)
+    assert module.get_diff_changes() is None
+    f, g, h = module.children[:3]
+    old_return = g.children[-1].children[2]
+
+    differ.parse(code2, parsers=ANY, copies=ANY)
+    changes = module.get_diff_changes()
+    # The diff parser reparses a bit more than necessary.
+    assert changes.reused == [(g, 2)]
+    assert [node.get_code() for node in changes.added] == [
+        'import os\n', '\ndef f():\n    return 1\n', '    return y\n',
+        '\ndef h():\n    return 2\n',
+    ]
+    assert old_return in changes.removed
+    assert old_return.parent is g.children[-1]
+    assert f in changes.removed and h in changes.removed
+
+
+def test_snapshot():
+    grammar = load_grammar()
+    code1 = 'def f():\n    return 1\n\nx = 1\n'
+    code2 = 'import os\ndef f():\n    return 2\n\nx = 1\n'
+    module = grammar.parse(code1, diff_cache=True, document_key='snapshot')
+    try:
+        module.get_used_names()
+        new = grammar.parse(code2, diff_cache=True, document_key='snapshot', snapshot=True)
+        assert new is not module
+        assert module.get_code() == code1
+        _assert_valid_graph(module)
+        _assert_valid_graph(new)
+        _assert_nodes_are_equal(new, parse(code2))
+        _assert_used_names_are_equal(new.get_used_names(), parse(code2).get_used_names())
+        assert not set(map(id, module.walk())) & set(map(id, new.walk()))
+
+        assert grammar.parse(code1, diff_cache=True, document_key='snapshot') is new
+        assert new.get_code() == code1
+    finally:
+        grammar.close_document('snapshot')
+
+
+def test_record_diff_changes():
+    grammar = load_grammar()
+    module = grammar.parse('x = 1\n', diff_cache=True, document_key='changes')
+    try:
+        grammar.parse('x = 2\n', diff_cache=True, document_key='changes')
+        assert module.get_diff_changes() is None
+
+        grammar.parse('x = 3\n', diff_cache=True, document_key='changes',
+                      record_diff_changes=True)
+        assert module.get_diff_changes().added
+        module.get_leaf_for_position((1, 0))
+
+        # Only the tree is pickled, the changes and indexes are not.
+        pickled = pickle.loads(pickle.dumps(module))
+        assert pickled.get_code() == 'x = 3\n'
+        assert pickled.get_diff_changes() is None
+        assert pickled._leaf_index is None
+    finally:
+        grammar.close_document('changes')
+
+    with pytest.raises(TypeError):
+        grammar.parse('x', record_diff_changes=True)
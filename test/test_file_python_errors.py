@@ -1,6 +1,9 @@
 import os
 
+import pytest
+
 import parso
+from parso.python.pep8 import PEP8NormalizerConfig
 
 
 def get_python_files(path):
@@ -21,3 +24,43 @@ def test_on_itself(each_version):
         tree = grammar.parse(path=file)
         errors = list(grammar.iter_errors(tree))
         assert not errors
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_check_files(tmp_path, workers):
+    codes = ['x = 1\n', 'def f(:\n', 'x=1\nimport os\n', '    1\n']
+    paths = []
+    for i, code in enumerate(codes):
+        path = tmp_path / ('file%s.py' % i)
+        path.write_text(code)
+        paths.append(path)
+
+    grammar = parso.load_grammar()
+    config = PEP8NormalizerConfig()
+    for normalizer_config in [None, config]:
+        results = grammar.check_files(paths, workers=workers, normalizer_config=normalizer_config)
+        results = {path: [(i.start_pos, i.code) for i in issues] for path, issues in results}
+        expected = {}
+        for path, code in zip(paths, codes):
+            module = grammar.parse(code)
+            if normalizer_config is None:
+                issues = grammar.iter_errors(module)
+            else:
+                issues = grammar._get_normalizer_issues(module, config)
+            expected[path] = [(i.start_pos, i.code) for i in issues]
+        assert results == expected
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_check_files_with_broken_files(tmp_path, workers):
+    valid = tmp_path / 'valid.py'
+    valid.write_text('x = 1\n')
+    missing = tmp_path / 'missing.py'
+    undecodable = tmp_path / 'undecodable.py'
+    undecodable.write_bytes(b'# coding: utf-8\nx = "\xff"\n')
+
+    grammar = parso.load_grammar()
+    results = dict(grammar.check_files([valid, missing, undecodable, valid], workers=workers))
+    assert results[valid] == []
+    assert isinstance(results[missing], FileNotFoundError)
+    assert isinstance(results[undecodable], UnicodeDecodeError)
@@ -1,8 +1,10 @@
 import difflib
+from textwrap import dedent
 
 import pytest
 
-from parso import parse
+from parso import parse, load_grammar
+from parso.utils import split_lines
 
 code_basic_features = '''
 """A mod docstring"""
@@ -131,3 +133,63 @@ def test_carriage_return_at_end(code, types):
 ])
 def test_full_code_round_trip(code):
     assert parse(code).get_code() == code
+
+
+def test_deeply_nested_code():
+    code = 'x = ' + '(' * 3000 + '1' + ')' * 3000 + '\n'
+    module = parse(code)
+    assert module.get_code() == code
+    expr_stmt = module.children[0].children[0]
+    assert expr_stmt.children[2].get_code(include_prefix=False) == code[4:-1]
+    assert load_grammar().refactor(module, {}) == code
+
+
+def test_refactor_as_edits():
+    code = dedent('''\
+        def foo(a, b):
+            return a + b  # comment
+
+        x = foo(1, 2)
+        ''')
+    grammar = load_grammar()
+    module = grammar.parse(code)
+    func = module.children[0]
+    return_stmt = next(func.iter_return_stmts())
+    x = module.children[1].children[0].children[0]
+    node_to_str_map = {
+        func.name: ' bar',
+        return_stmt.children[1]: ' a * b',
+        # Ignored, because it's part of a replaced node.
+        return_stmt.children[1].children[0]: 'c',
+        x: 'y',
+        # Ignored, because it's not part of the base node.
+        parse('z').children[0]: 'z',
+    }
+    edits = grammar.refactor(module, node_to_str_map, as_edits=True)
+    assert edits == [
+        ((1, 3), (1, 7), ' bar'),
+        ((2, 10), (2, 16), ' a * b'),
+        ((3, 0), (4, 1), 'y'),
+    ]
+
+    lines = split_lines(code, keepends=True)
+
+    def to_offset(position):
+        return sum(len(line) for line in lines[:position[0] - 1]) + position[1]
+
+    new_code = code
+    for start_pos, end_pos, text in reversed(edits):
+        new_code = new_code[:to_offset(start_pos)] + text + new_code[to_offset(end_pos):]
+    assert new_code == grammar.refactor(module, node_to_str_map)
+
+    grammar.parse(code, document_key='refactor', diff_cache=True)
+    try:
+        new_module = grammar.parse(document_key='refactor', edits=reversed(edits),
+                                   diff_cache=True)
+        assert new_module.get_code() == new_code
+    finally:
+        grammar.close_document('refactor')
+    assert grammar.refactor(func, node_to_str_map, as_edits=True) == edits[:2]
+    assert grammar.refactor(func, {func: 'pass\n'}, as_edits=True) == [
+        ((1, 0), (3, 0), 'pass\n'),
+    ]
@@ -9,6 +9,7 @@ from functools import total_ordering
 from typing import Iterator, Tuple
 
 import parso
+from parso.python.pep8 import PEP8NormalizerConfig
 from parso.utils import python_bytes_to_unicode
 
 
@@ -69,3 +70,20 @@ def test_normalizer_issue(normalizer_issue_case):
     # statements by executing the comparison earlier.
     _bool = desired == actual
     assert _bool, '\n' + diff
+
+
+def test_selected_codes(normalizer_issue_case):
+    with open(normalizer_issue_case.path, 'rb') as f:
+        code = python_bytes_to_unicode(f.read())
+
+    grammar = parso.load_grammar(version=normalizer_issue_case.python_version)
+    module = grammar.parse(code)
+    issues = [(i.start_pos, i.code) for i in grammar._get_normalizer_issues(module)]
+    for include_codes in [{501}, {225, 231}, {111, 128}, {302, 305}, {701, 901, 903}]:
+        config = PEP8NormalizerConfig(include_codes=include_codes)
+        selected = [(i.start_pos, i.code) for i in grammar._get_normalizer_issues(module, config)]
+        assert selected == [i for i in issues if i[1] in include_codes]
+
+    config = PEP8NormalizerConfig(exclude_codes={501, 225})
+    selected = [(i.start_pos, i.code) for i in grammar._get_normalizer_issues(module, config)]
+    assert selected == [i for i in issues if i[1] not in (501, 225)]
@@ -3,7 +3,7 @@ from textwrap import dedent
 
 import pytest
 
-from parso import parse
+from parso import parse, load_grammar, ParserSyntaxError
 from parso.python import tree
 from parso.utils import split_lines
 
@@ -267,3 +267,21 @@ def test_pep695_class_no_bases(works_ge_py312):
 )
 def test_pep696_type_param_defaults(works_ge_py313, code):
     works_ge_py313.parse(code)
+
+
+@pytest.mark.parametrize('code', [
+    'x = 1\n', 'x = 1', 'def f():\n    return 1', 'if x:\n    pass\nelse:\n  y\n',
+    'f"{x!r}"\n', '', '1 +\n', 'def f(:\n    pass\n', 'class C:\npass\n', 'x = (\n',
+    'lambda x: 1 = 2', '1 2 3',
+])
+def test_validate(each_version, code):
+    grammar = load_grammar(version=each_version)
+    error = grammar.validate(code)
+    try:
+        grammar.parse(code, error_recovery=False)
+    except ParserSyntaxError as e:
+        assert error is not None
+        assert error.message == e.message
+        assert error.error_leaf.start_pos == e.error_leaf.start_pos
+    else:
+        assert error is None
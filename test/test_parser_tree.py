@@ -1,12 +1,14 @@
 # -*- coding: utf-8    # This file contains Unicode characters.
 
+import symtable
+import sys
 from textwrap import dedent
 
 import pytest
 
 from parso import parse
 from parso.python import tree
-from parso.tree import search_ancestor
+from parso.tree import BaseNode, search_ancestor
 
 
 class TestsFunctionAndLambdaParsing:
@@ -264,3 +266,171 @@ sample_leaf = sample_node.children[0]
 def test_search_ancestor(node, node_types, expected_ancestor):
     assert node.search_ancestor(*node_types) is expected_ancestor
     assert search_ancestor(node, *node_types) is expected_ancestor  # deprecated
+
+
+def test_module_get_leaf_for_position():
+    code = dedent('''\
+        def foo(a, b):
+            """
+            doc
+            """
+            return a +  b  # comment
+        ''')
+    module = parse(code)
+    for line_nr, line in enumerate(code.splitlines(True), 1):
+        for column in range(len(line)):
+            for include_prefixes in (False, True):
+                expected = BaseNode.get_leaf_for_position(
+                    module, (line_nr, column), include_prefixes)
+                leaf = module.get_leaf_for_position((line_nr, column), include_prefixes)
+                assert leaf is expected
+
+    assert module._leaf_index is not None
+    assert module.get_leaf_for_position((5, 13)).value == '+'
+    assert module.get_leaf_for_position((5, 15)) is None
+    assert module.get_leaf_for_position((5, 15), include_prefixes=True).value == 'b'
+    with pytest.raises(ValueError):
+        module.get_leaf_for_position((7, 0))
+
+    # The index of the leaves is only created after a few lookups.
+    module = parse('x = 1\n' * 99)
+    for i in range(1, 10):
+        assert module.get_leaf_for_position((i, 1)).value == 'x'
+        assert module._leaf_index is None
+    assert module.get_leaf_for_position((10, 4)).value == '1'
+    assert module._leaf_index is not None
+
+
+def test_walk_and_iter_leaves():
+    module = parse('def f(a):\n    return [a for a in b]\n')
+    nodes = list(module.walk())
+    assert nodes[0] is module
+    assert nodes[1].type == 'funcdef'
+    assert [n for n in nodes if isinstance(n, tree.Leaf)] == list(module.iter_leaves())
+    assert [leaf.value for leaf in module.iter_leaves()] == [
+        'def', 'f', '(', 'a', ')', ':', '\n', 'return', '[', 'a', 'for', 'a',
+        'in', 'b', ']', '\n', ''
+    ]
+
+
+def test_iter_descendants():
+    module = parse('def f(a):\n    return [a for a in b]\nx = lambda y: y\n')
+    names = module.iter_descendants('name')
+    assert [n.value for n in names] == ['f', 'a', 'a', 'a', 'b', 'x', 'y', 'y']
+
+    names = module.iter_descendants('name', 'lambdef', skip_types={'funcdef', 'lambdef'})
+    assert [n.type for n in names] == ['name', 'lambdef']
+
+
+def test_deeply_nested_iteration():
+    code = 'x = ' + '(' * 3000 + '1' + ')' * 3000 + '\n'
+    module = parse(code)
+    assert len(list(module.iter_leaves())) == 6000 + 5
+    assert next(module.iter_descendants('number')).value == '1'
+    assert BaseNode.get_leaf_for_position(module, (1, 3005)).value == '1'
+
+
+def test_get_nodes_by_type():
+    code = dedent('''\
+        import os
+        def f():
+            from x import y
+            return "a" "b"
+        class C:
+            import sys
+        ''')
+    module = parse(code)
+    imports = module.get_nodes_by_type('import_from', 'import_name')
+    assert [i.get_code(include_prefix=False) for i in imports] == [
+        'import os', 'from x import y', 'import sys'
+    ]
+    assert [s.value for s in module.get_nodes_by_type('string')] == ['"a"', '"b"']
+    assert module.get_nodes_by_type('funcdef') == [module.children[1]]
+    assert module.get_nodes_by_type('file_input') == [module]
+    assert module.get_nodes_by_type('lambdef') == []
+
+
+def test_symbol_table():
+    code = dedent('''\
+        import os
+        from foo import bar as baz
+        x = 1
+        def f(a, b=x):
+            global x
+            x = 3
+            for i in [j for j in a]:
+                pass
+            def g():
+                nonlocal i
+                i = lambda y: y
+            a.b.c = 2
+            a[i] = 3
+            return g
+        class C:
+            z: int = 3
+
+            def __init__(self):
+                self.x = 1
+        ''')
+    module = parse(code)
+    table = module.get_symbol_table()
+    assert table.scope is module
+    assert table.parent is None
+    assert sorted(table.get_defined_names()) == ['C', 'baz', 'f', 'os', 'x']
+    assert [n.start_pos for n in table.get_definitions('x')] == [(3, 0)]
+    assert table.get_definitions('unknown') == []
+
+    func = module.children[3]
+    func_table = func.get_symbol_table()
+    assert func_table.parent is table
+    assert [t.scope.type for t in func_table.children] == ['funcdef']
+    assert sorted(func_table.get_defined_names()) == ['a', 'b', 'g', 'i', 'x']
+    assert func_table.is_global('x')
+    assert not func_table.is_global('i')
+    assert [n.value for n in func_table.get_global_names()] == ['x']
+
+    g_table, = func_table.children
+    assert g_table.is_nonlocal('i')
+    assert [n.value for n in g_table.get_nonlocal_names()] == ['i']
+    assert g_table.get_defined_names() == ['i']
+    lambda_table, = g_table.children
+    assert lambda_table.scope.type == 'lambdef'
+    assert lambda_table.get_defined_names() == ['y']
+
+    class_table = module.children[4].get_symbol_table()
+    assert class_table.get_defined_names() == ['z', '__init__']
+    init_table, = class_table.children
+    assert init_table.get_defined_names() == ['self']
+
+
+def _assert_symbol_tables_equal(cpython_table, table):
+    expected = {
+        symbol.get_name() for symbol in cpython_table.get_symbols()
+        if (symbol.is_assigned() or symbol.is_imported() or symbol.is_parameter()
+            or symbol.is_namespace())
+        and not symbol.is_declared_global() and not symbol.is_nonlocal()
+    }
+    assert set(table.get_defined_names()) == expected
+    assert len(table.children) == len(cpython_table.get_children())
+    for cpython_child, child in zip(cpython_table.get_children(), table.children):
+        _assert_symbol_tables_equal(cpython_child, child)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 8), reason="Walrus needs Python 3.8")
+@pytest.mark.parametrize('code', [
+    'def f(a=(y := 1)): pass\n',
+    'def f(a: (y := int) = lambda b: b) -> (z := int):\n    c = 1\n',
+    '@(d := decorator)\ndef f(*args: (y := 1), **kwargs): pass\n',
+    'class C((b := object), metaclass=(m := type)):\n    x = 1\n',
+    'f = lambda a=(y := 1): (z := a)\n',
+    'def f(self):\n    self.x = y = 1\n',
+])
+def test_symbol_table_like_cpython(code):
+    _assert_symbol_tables_equal(symtable.symtable(code, 'test', 'exec'),
+                                parse(code).get_symbol_table())
+
+
+def test_symbol_table_without_module():
+    func = parse('def f(a):\n    b = a\n').children[0]
+    func.parent = None
+    assert sorted(func.get_symbol_table().get_defined_names()) == ['a', 'b']
@@ -1,4 +1,5 @@
 import parso
+from parso.python.pep8 import PEP8Normalizer, PEP8NormalizerConfig
 
 
 def issues(code):
@@ -40,3 +41,52 @@ def test_shebang():
     assert not issues('#!\n')
     assert not issues('#!/foo\n')
     assert not issues('#! python\n')
+
+
+def test_line_range():
+    code = 'import os\ndef f():\n    x=1\n\n\n\n\nclass C:\n    y=2\nz=3  \n'
+    grammar = parso.load_grammar()
+    module = parso.parse(code)
+    codes = [(i.start_pos[0], i.code) for i in grammar._get_normalizer_issues(module)]
+    assert codes == [(2, 302), (3, 225), (3, 225), (6, 303), (7, 303), (9, 225), (9, 225),
+                     (10, 302), (10, 225), (10, 225), (10, 291)]
+    for first, last in [(1, 1), (3, 3), (6, 6), (8, 9), (10, 10)]:
+        found = grammar._get_normalizer_issues(module, line_range=(first, last))
+        expected = [c for c in codes if first <= c[0] <= last]
+        assert [(i.start_pos[0], i.code) for i in found] == expected
+
+
+def test_normalize():
+    # The issues are collected without building the code, but normalizing
+    # still returns the code.
+    code = 'x=1\ndef f( a ):\n    pass\n'
+    grammar = parso.load_grammar()
+    assert grammar._normalize(parso.parse(code)) == code
+
+
+def test_reused_normalizer():
+    grammar = parso.load_grammar()
+    normalizer = PEP8NormalizerConfig().create_normalizer(grammar)
+    for code in ['def f():\n  x=1\n\n\n\n', 'class C:\n    pass\nx = 1', 'import os\n']:
+        module = parso.parse(code)
+        normalizer.check(module)
+        expected = grammar._get_normalizer_issues(module)
+        assert [(i.code, i.start_pos) for i in normalizer.issues] \
+            == [(i.code, i.start_pos) for i in expected]
+
+
+def test_start_pos_of_prefix():
+    class Normalizer(PEP8Normalizer):
+        def _get_start_pos_of_prefix(self, leaf):
+            start_pos = super()._get_start_pos_of_prefix(leaf)
+            assert start_pos == leaf.get_start_pos_of_prefix()
+            return start_pos
+
+    class Config(PEP8NormalizerConfig):
+        normalizer_class = Normalizer
+
+    code = 'def f(a,  # comment\n      b):\n  x = (1 +\n    2)\n\n\n  return \\\n 3\n$\nx\n'
+    grammar = parso.load_grammar()
+    module = grammar.parse(code)
+    for line_range in [None, (5, 7), (9, 10)]:
+        grammar._get_normalizer_issues(module, Config(), line_range=line_range)
@@ -1,9 +1,12 @@
 """
 Testing if parso finds syntax errors and indentation errors.
 """
+import gc
+import pickle
 import re
 import sys
 import warnings
+from contextlib import contextmanager
 
 import pytest
 
@@ -11,6 +14,10 @@ import parso
 
 from textwrap import dedent
 from parso._compatibility import is_pypy
+from parso.normalizer import Rule
+from parso.python.errors import ErrorFinder, ErrorFinderConfig
+from parso.python.pep8 import PEP8NormalizerConfig
+from parso.python.tree import Module
 from .failing_examples import FAILING_EXAMPLES, indent, build_nested
 
 
@@ -573,3 +580,176 @@ def test_valid_del(code):
 )
 def test_lambda_in_comp_if(source, version, no_errors):
     assert bool(_get_error_list(source, version=version)) ^ no_errors
+
+
+def _issue_tuples(issues):
+    return [(issue.start_pos, issue.end_pos, issue.code, issue.message) for issue in issues]
+
+
+@pytest.mark.parametrize('code', FAILING_EXAMPLES)
+def test_incremental_errors(code):
+    grammar = parso.load_grammar()
+    module = grammar.parse(code)
+    expected = _issue_tuples(grammar.iter_errors(module))
+    assert _issue_tuples(grammar.iter_errors(module, incremental=True)) == expected
+    # The second time the cached issues are used.
+    assert _issue_tuples(grammar.iter_errors(module, incremental=True)) == expected
+
+
+@pytest.mark.parametrize('code', [
+    'def f():\n    yield from []\n\nasync def g():\n    await x\n',
+    'x = 1\nglobal x\ndef f():\n    return 1\n',
+    'def f():\n    nonlocal x\n    x = 1\n',
+    '"""docstring"""\nfrom __future__ import division\n',
+    'def x(a, b=1, *, c=2, d):\n    pass\n\n\n'
+    'def c():\n\n    def d():\n        class X():\n            nonlocal a\n',
+])
+def test_incremental_errors_after_change(code):
+    grammar = parso.load_grammar()
+    module = grammar.parse(code, diff_cache=True, document_key='errors')
+    try:
+        grammar.iter_errors(module, incremental=True)
+        for new_code in ['import os\n' + code, 'return 1\n\n' + code, 'x = 2\n' + code]:
+            module = grammar.parse(new_code, diff_cache=True, document_key='errors')
+            assert _issue_tuples(grammar.iter_errors(module, incremental=True)) \
+                == _issue_tuples(grammar.iter_errors(module))
+    finally:
+        grammar.close_document('errors')
+
+
+def test_iter_errors_line_range():
+    code = 'def f():\n    1 +\n\nclass C:\n    x = 1\n    return 2\n\ndel f()\n'
+    grammar = parso.load_grammar()
+    module = grammar.parse(code)
+    issues = _issue_tuples(grammar.iter_errors(module))
+    for line_range in [(1, 1), (2, 2), (4, 6), (6, 8), (3, 3), (1, 100)]:
+        first, last = line_range
+        expected = [i for i in issues if first <= i[0][0] <= last]
+        assert _issue_tuples(grammar.iter_errors(module, line_range=line_range)) == expected
+
+    with pytest.raises(ValueError):
+        grammar.iter_errors(module, incremental=True, line_range=(1, 2))
+
+
+@pytest.mark.parametrize('kwargs', [{}, {'max_issues': 1}, {'incremental': True}])
+def test_error_finder_releases_module(kwargs):
+    grammar = parso.load_grammar()
+    code = 'def released_module():\n    1 +\n'
+    module = grammar.parse(code)
+    assert grammar.iter_errors(module, **kwargs)
+    del module
+    gc.collect()
+    assert not [o for o in gc.get_objects()
+                if isinstance(o, Module) and o.get_code() == code]
+
+
+def test_reused_error_finder():
+    grammar = parso.load_grammar()
+    normalizer = ErrorFinderConfig().create_normalizer(grammar)
+    for code in FAILING_EXAMPLES:
+        module = grammar.parse(code)
+        normalizer.check(module)
+        # A new config always creates a new normalizer.
+        expected = _issue_tuples(grammar._get_normalizer_issues(module, ErrorFinderConfig()))
+        assert _issue_tuples(normalizer.issues) == expected
+        assert _issue_tuples(grammar.iter_errors(module)) == expected
+
+
+def test_register_rule_later():
+    class Finder(ErrorFinder):
+        pass
+
+    class Config(ErrorFinderConfig):
+        normalizer_class = Finder
+
+    grammar = parso.load_grammar()
+    module = grammar.parse('x = 1\n')
+    assert not grammar._get_normalizer_issues(module, Config())
+
+    @Finder.register_rule(type='number')
+    class NumberRule(Rule):
+        code = 1
+        message = 'number'
+
+        def is_issue(self, node):
+            return True
+
+    issues = grammar._get_normalizer_issues(module, Config())
+    assert [(i.code, i.start_pos) for i in issues] == [(1, (1, 4))]
+    # The base class is not changed.
+    assert not grammar._get_normalizer_issues(module, ErrorFinderConfig())
+
+
+def test_visit_node_exits_on_error():
+    class Finder(ErrorFinder):
+        @contextmanager
+        def visit_node(self, node):
+            entered.append(node.type)
+            try:
+                yield
+            except ZeroDivisionError:
+                exited.append(node.type)
+                raise
+
+    @Finder.register_rule(type='number')
+    class RaisingRule(Rule):
+        code = 1
+        message = 'number'
+
+        def is_issue(self, node):
+            raise ZeroDivisionError
+
+    class Config(ErrorFinderConfig):
+        normalizer_class = Finder
+
+    entered = []
+    exited = []
+    grammar = parso.load_grammar()
+    module = grammar.parse('x = 1\n')
+    with pytest.raises(ZeroDivisionError):
+        grammar._get_normalizer_issues(module, Config())
+    assert entered == ['file_input', 'simple_stmt', 'expr_stmt']
+    assert exited == entered[::-1]
+
+
+def test_selected_codes():
+    grammar = parso.load_grammar()
+    module = grammar.parse('def f():\n    1 +\n  x\n')
+    codes = [i.code for i in grammar._get_normalizer_issues(module, ErrorFinderConfig())]
+    assert codes == [901, 903]
+    config = ErrorFinderConfig(include_codes={901})
+    assert [i.code for i in grammar._get_normalizer_issues(module, config)] == [901]
+    config = ErrorFinderConfig(exclude_codes={901})
+    assert [i.code for i in grammar._get_normalizer_issues(module, config)] == [903]
+
+
+def test_issue_is_detached():
+    grammar = parso.load_grammar()
+    issue, = grammar.iter_errors(grammar.parse('x = (\n'))
+    assert not hasattr(issue, '__dict__')
+    copied = pickle.loads(pickle.dumps(issue))
+    assert (copied.code, copied.message, copied.start_pos, copied.end_pos) \
+        == (issue.code, issue.message, issue.start_pos, issue.end_pos)
+
+
+@pytest.mark.parametrize('max_issues', [1, 2, 3])
+def test_max_issues(max_issues):
+    code = 'def f(:\n    pass\nx = 1 +\ndef g():\n    nonlocal y\n1 = 2\n'
+    grammar = parso.load_grammar()
+    module = grammar.parse(code)
+    expected = _issue_tuples(grammar.iter_errors(module))
+    assert len(expected) > 3
+    assert _issue_tuples(grammar.iter_errors(module, max_issues=max_issues)) \
+        == expected[:max_issues]
+    # The normalizer is reused afterwards.
+    assert _issue_tuples(grammar.iter_errors(module)) == expected
+
+
+def test_max_issues_errors():
+    grammar = parso.load_grammar()
+    module = grammar.parse('1 +\n')
+    for max_issues in (0, -1):
+        with pytest.raises(ValueError):
+            grammar.iter_errors(module, max_issues=max_issues)
+    with pytest.raises(TypeError):
+        grammar._get_normalizer_issues(module, PEP8NormalizerConfig(), max_issues=1)